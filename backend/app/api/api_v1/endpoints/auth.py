@@ -1,10 +1,13 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.core import security
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
+from app.core.rate_limit import RateLimiter, client_ip
 from app.models.user import User
 from app.schemas.user import UserCreate, User as UserSchema
 from app.services.user_service import UserService
@@ -43,7 +46,13 @@ class LoginPayload(BaseModel):
     username: str
     password: str
 
-@router.post("/login")
+# 按“用户名 + 客户端 IP”限流：限制单个来源对同一账号的猜测，
+# 且不会因为别人用该用户名刷请求而把账号本人锁在外面；防刷主要依靠下面按 IP 的限流
+login_account_limiter = RateLimiter("login_account", capacity=5, per_seconds=60)
+
+@router.post("/login", dependencies=[
+    Depends(RateLimiter("login", capacity=10, per_seconds=60, by="ip")),
+])
 async def login(
     request: Request,
     db: Session = Depends(get_db),
@@ -76,7 +85,14 @@ async def login(
     except Exception:
         raise HTTPException(status_code=422, detail="请求体格式错误")
 
-    user = user_service.authenticate_user(username, password)
+    if username:
+        await run_in_threadpool(
+            login_account_limiter.check,
+            f"user:{str(username).strip().lower()}:ip:{client_ip(request)}",
+        )
+
+    # bcrypt 校验是 CPU 密集操作，放到线程池执行，避免阻塞事件循环
+    user = await run_in_threadpool(user_service.authenticate_user, username, password)
     if not user:
         raise HTTPException(status_code=401, detail="用户名或密码错误")
 
@@ -94,9 +110,8 @@ async def login(
     )
     return {"user": UserSchema.model_validate(user)}
 
-@router.get("/me", response_model=UserSchema)
-def get_current_user(request: Request, db: Session = Depends(get_db)):
-    """从Cookie中获取当前用户信息"""
+def _current_user_id(request: Request) -> int:
+    """从Cookie中的令牌解析用户ID，未登录或令牌无效时抛出 401"""
     from jose import jwt, JWTError
 
     token = request.cookies.get("access_token")
@@ -110,9 +125,24 @@ def get_current_user(request: Request, db: Session = Depends(get_db)):
             raise HTTPException(status_code=401, detail="无效凭据")
     except JWTError:
         raise HTTPException(status_code=401, detail="无效凭据")
+    return int(user_id)
 
+def get_current_user(request: Request, db: Session = Depends(get_db)):
+    """从Cookie中获取当前用户信息"""
     user_service = UserService(db)
-    user = user_service.get_user_by_id(int(user_id))
+    user = user_service.get_user_by_id(_current_user_id(request))
+    if user is None:
+        raise HTTPException(status_code=401, detail="用户不存在")
+    return user
+
+@router.get("/me", response_model=UserSchema)
+def read_me(current_user: User = Depends(get_current_user)):
+    """获取当前登录用户信息"""
+    return current_user
+
+async def get_current_user_async(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """get_current_user 的异步会话版本（供 async 路由使用，不占用线程池与同步连接池）"""
+    user = await db.get(User, _current_user_id(request))
     if user is None:
         raise HTTPException(status_code=401, detail="用户不存在")
     return user
@@ -1,229 +1,203 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional, Union
-from sqlalchemy import func
+from sqlalchemy import select
+import asyncio
 import json
-import random
-from datetime import datetime
+import logging
 
-from app.core.database import get_db
-from app.api.api_v1.endpoints.auth import get_current_user
+from app.core.database import SessionLocal, get_db, get_async_db
+from app.core.rate_limit import RateLimiter
+from app.api.api_v1.endpoints.auth import get_current_user, get_current_user_async
 from app.models.user import User
-from app.models.challenge import Challenge, ChallengeSubmission
+from app.models.challenge import Challenge
 from app.models.exercise import Exercise
-from app.schemas.challenge import ChallengeCreate, ChallengeMetaResponse, ChallengeSubmission as ChallengeSubmissionSchema, ChallengePageResponse
+from app.schemas.challenge import ChallengeCreate, ChallengeMetaResponse, ChallengeSubmission as ChallengeSubmissionSchema, ChallengePageResponse, LeaderboardEntry
 from app.services.exercise_service import ExerciseService
-from app.challenge_validators.registry import get_validator_for_exercise
+from app.services.exercise_catalog import exercise_index
+from app.services.completion_feed import completion_feed
+from app.services.leaderboard_service import LeaderboardService, get_leaderboard_store
+from app.services.challenge_service import (
+    PAGE_SIZE, TOTAL_PAGES,
+    ChallengeService, get_page_numbers, new_challenge, upgrade_challenge
+)
+from app.challenge_validators import PageAccessDenied
+from app.challenge_validators.registry import get_validator_for_exercise, get_public_params, guard_page_request
 
 router = APIRouter()
 
+SSE_HEARTBEAT_SECONDS = 15
+
 def resolve_exercise_id(exercise_id_or_sort_order: int, db: Session) -> int:
-    """解析exercise_id，支持通过ID或sort_order查找"""
-    # 首先尝试通过ID查找
-    exercise = db.query(Exercise).filter(Exercise.id == exercise_id_or_sort_order).first()
-    if exercise:
-        return exercise.id
-    
-    # 如果通过ID找不到，尝试通过sort_order查找
-    exercise = db.query(Exercise).filter(
-        Exercise.sort_order == exercise_id_or_sort_order,
-        Exercise.is_active == True
-    ).first()
-    if exercise:
-        return exercise.id
+    """解析exercise_id，支持通过ID或sort_order查找（进程内索引，无需查询）"""
+    exercise_id = exercise_index.resolve(exercise_id_or_sort_order, db)
     
     # 如果都找不到，返回原始值（让后续的错误处理来处理）
-    return exercise_id_or_sort_order
-
-def generate_challenge_numbers(user_id: int, exercise_id: int) -> tuple[List[List[int]], int]:
-    """生成用户特定的挑战数字"""
-    numbers: List[List[int]] = []
-    total_sum = 0
-    
-    for page in range(100):
-        # 为每一页创建确定性的随机源，避免顺序数字
-        rng = random.Random(f"user:{user_id}|ex:{exercise_id}|page:{page}")
-        # 在 1..200 中采样 10 个互不相同的数字，顺序由随机源决定
-        page_numbers = rng.sample(range(1, 201), 10)
-        total_sum += sum(page_numbers)
-        numbers.append(page_numbers)
-    
-    return numbers, total_sum
+    return exercise_id if exercise_id is not None else exercise_id_or_sort_order
 
-def _expected_page_numbers(user_id: int, exercise_id: int, page_zero_based: int) -> List[int]:
-    rng = random.Random(f"user:{user_id}|ex:{exercise_id}|page:{page_zero_based}")
-    return rng.sample(range(1, 201), 10)
-
-def ensure_challenge_up_to_date(challenge: Challenge, db: Session) -> tuple[list[list[int]], int]:
-    """如果旧数据与新规则不一致，则重新生成并持久化。返回(numbers, total_sum)。"""
-    numbers = json.loads(challenge.numbers_data)
-    if not numbers or not isinstance(numbers, list) or not isinstance(numbers[0], list):
-        new_numbers, new_total = generate_challenge_numbers(challenge.user_id, challenge.exercise_id)
-        challenge.numbers_data = json.dumps(new_numbers)
-        challenge.total_sum = new_total
+def ensure_challenge_up_to_date(challenge: Challenge, db: Session) -> int:
+    """旧格式数据转换为新格式并持久化。返回 total_sum。"""
+    if upgrade_challenge(challenge):
         db.add(challenge)
         db.commit()
-        return new_numbers, new_total
+    return challenge.total_sum
 
-    # 对比第 0 页是否符合新规则
-    expected_first = _expected_page_numbers(challenge.user_id, challenge.exercise_id, 0)
-    if numbers[0] != expected_first:
-        new_numbers, new_total = generate_challenge_numbers(challenge.user_id, challenge.exercise_id)
-        challenge.numbers_data = json.dumps(new_numbers)
-        challenge.total_sum = new_total
-        db.add(challenge)
-        db.commit()
-        return new_numbers, new_total
+async def resolve_exercise_id_async(exercise_id_or_sort_order: int, db: AsyncSession) -> int:
+    """resolve_exercise_id 的异步会话版本"""
+    exercise_id = await exercise_index.resolve_async(exercise_id_or_sort_order, db)
+    return exercise_id if exercise_id is not None else exercise_id_or_sort_order
+
+async def get_user_challenge_async(user_id: int, exercise_id: int, db: AsyncSession) -> Optional[Challenge]:
+    result = await db.execute(
+        select(Challenge).where(
+            Challenge.user_id == user_id,
+            Challenge.exercise_id == exercise_id
+        ).limit(1)
+    )
+    return result.scalars().first()
 
-    return numbers, challenge.total_sum
+async def ensure_challenge_up_to_date_async(challenge: Challenge, db: AsyncSession) -> int:
+    """ensure_challenge_up_to_date 的异步会话版本"""
+    if upgrade_challenge(challenge):
+        await db.commit()
+    return challenge.total_sum
+
+def verify_page_access(exercise_id: int, user: User, r: Optional[str]) -> None:
+    """翻页访问校验，由题目校验器的 guard_page_request 决定（如第一题的 MD5 参数 r）"""
+    try:
+        guard_page_request(exercise_id, user=user, params={"r": r})
+    except PageAccessDenied as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _page_response(challenge: Challenge, page_number: int) -> ChallengePageResponse:
+    return ChallengePageResponse(
+        page_number=page_number,
+        numbers=get_page_numbers(challenge, page_number),
+        start_index=(page_number - 1) * PAGE_SIZE + 1,
+        end_index=page_number * PAGE_SIZE
+    )
 
 @router.get("/progress")
-async def get_user_progress(
+def get_user_progress(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """获取用户挑战进度（放在可变路径前，避免被 /{exercise_id} 吃掉）"""
-    # 获取已完成的挑战
-    completed_challenges = db.query(Challenge).filter(
-        Challenge.user_id == current_user.id,
-        Challenge.is_completed == True
-    ).all()
-    
-    # 获取总积分
-    total_score = sum(challenge.score or 0 for challenge in completed_challenges)
-    
-    # 获取总尝试次数
-    total_attempts = db.query(ChallengeSubmission).filter(
-        ChallengeSubmission.user_id == current_user.id
-    ).count()
-    
-    # 获取平均用时
-    completed_times = [challenge.best_time for challenge in completed_challenges if challenge.best_time]
-    average_time = sum(completed_times) / len(completed_times) if completed_times else 0
+    # 汇总行随提交增量维护，这里只需一次主键读取
+    summary = ChallengeService(db).get_summary(current_user.id)
+    average_time = summary.sum_best_time / summary.solved_count if summary.solved_count else 0
     
     return {
-        "completed_challenges": [challenge.exercise_id for challenge in completed_challenges],
-        "total_score": total_score,
-        "total_attempts": total_attempts,
+        "completed_challenges": json.loads(summary.completed_exercise_ids or "[]"),
+        "total_score": summary.total_score,
+        "total_attempts": summary.total_attempts,
         "average_time": int(average_time)
     }
 
-def _honor_title(solved_count: int) -> str:
-    tier = solved_count // 3
-    if tier <= 0:
-        return "新手入门"
-    if tier == 1:
-        return "初探江湖"
-    if tier == 2:
-        return "小有成就"
-    if tier == 3:
-        return "登堂入室"
-    if tier == 4:
-        return "炉火纯青"
-    if tier == 5:
-        return "登峰造极"
-    return "传说宗师"
-
 @router.get("/leaderboard")
-async def get_leaderboard(
+def get_leaderboard(
     sort_by: str = Query("score", regex="^(score|solved)$"),
     limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db)
 ):
-    """获取全站用户聚合排行榜（按总分或解题数）。"""
-    q = (
-        db.query(
-            User.id.label("user_id"),
-            User.username,
-            User.full_name,
-            User.avatar_url,
-            func.coalesce(func.sum(Challenge.score), 0).label("total_score"),
-            func.count(Challenge.id).label("solved_count"),
-            func.max(Challenge.completed_at).label("last_submission_at"),
-        )
-        .join(Challenge, Challenge.user_id == User.id)
-        .filter(Challenge.is_completed == True)
-        .group_by(User.id)
-    )
-
-    if sort_by == "solved":
-        # 仅显示通过题数 > 1 的用户
-        q = q.having(func.count(Challenge.id) > 1)
-        q = q.order_by(func.count(Challenge.id).desc(), func.coalesce(func.sum(Challenge.score), 0).desc())
-    else:
-        # 仅显示积分 > 1 的用户
-        q = q.having(func.coalesce(func.sum(Challenge.score), 0) > 1)
-        q = q.order_by(func.coalesce(func.sum(Challenge.score), 0).desc(), func.count(Challenge.id).desc())
+    """获取全站用户聚合排行榜（按总分或解题数），由有序集合直接读取前 N 名。"""
+    return LeaderboardService(db).top(sort_by, limit)
 
-    rows = q.limit(limit).all()
-
-    leaderboard = []
-    for r in rows:
-        leaderboard.append({
-            "user_id": r.user_id,
-            "username": r.username,
-            "full_name": r.full_name,
-            "avatar_url": r.avatar_url,
-            "total_score": int(r.total_score or 0),
-            "solved_count": int(r.solved_count or 0),
-            "last_submission_at": r.last_submission_at.isoformat() if r.last_submission_at else None,
-            "honor_title": _honor_title(int(r.solved_count or 0)),
-        })
+@router.get("/leaderboard/me")
+def get_my_rank(
+    sort_by: str = Query("score", regex="^(score|solved)$"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """获取当前用户在排行榜中的名次，未上榜时 rank 为 null。"""
+    entry = LeaderboardService(db).my_rank(sort_by, current_user.id)
+    if entry is None:
+        return {"rank": None, "user_id": current_user.id, "total_score": 0, "solved_count": 0}
+    return entry
 
-    return leaderboard
+@router.get("/leaderboard/around-me")
+def get_leaderboard_around_me(
+    sort_by: str = Query("score", regex="^(score|solved)$"),
+    radius: int = Query(5, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """获取当前用户前后各 radius 名的排行榜片段。"""
+    return LeaderboardService(db).around(sort_by, current_user.id, radius)
 
 @router.get("/recent-completions")
-async def get_recent_completions(
+def get_recent_completions(
     limit: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db)
 ):
-    """最近通关记录，显示谁通过了哪一题。"""
-    rows = (
-        db.query(
-            Challenge.id.label("challenge_id"),
-            Challenge.completed_at,
-            Challenge.score,
-            User.id.label("user_id"),
-            User.username,
-            User.full_name,
-            User.avatar_url,
-            Exercise.id.label("exercise_id"),
-            Exercise.title.label("exercise_title"),
-        )
-        .join(User, User.id == Challenge.user_id)
-        .join(Exercise, Exercise.id == Challenge.exercise_id)
-        .filter(Challenge.is_completed == True)
-        .order_by(Challenge.completed_at.desc())
-        .limit(limit)
-        .all()
-    )
+    """最近通关记录，显示谁通过了哪一题（由进程内环形缓冲区提供）。"""
+    if not completion_feed.loaded:
+        completion_feed.load(db)
+    return completion_feed.recent(limit)
 
-    return [
-        {
-            "challenge_id": r.challenge_id,
-            "completed_at": r.completed_at.isoformat() if r.completed_at else None,
-            "score": r.score or 0,
-            "user_id": r.user_id,
-            "username": r.username,
-            "full_name": r.full_name,
-            "avatar_url": r.avatar_url,
-            "exercise_id": r.exercise_id,
-            "exercise_title": r.exercise_title,
-        }
-        for r in rows
-    ]
+def _load_completion_feed():
+    """用短生命周期的会话加载通关缓冲区，加载完立即归还连接"""
+    db = SessionLocal()
+    try:
+        completion_feed.load(db)
+    finally:
+        db.close()
+
+@router.get("/recent-completions/stream")
+async def stream_recent_completions(request: Request):
+    """最近通关记录的 SSE 推送：先回放缓冲区，再实时推送新的通关事件。"""
+    # 不依赖 get_db：yield 依赖要到流结束才清理，长连接会一直占用连接池中的连接
+    if not completion_feed.loaded:
+        await run_in_threadpool(_load_completion_feed)
+    
+    async def event_stream():
+        queue, backlog = completion_feed.subscribe()
+        try:
+            for event in backlog:
+                yield f"event: completion\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # 心跳，防止代理断开空闲连接
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: completion\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            completion_feed.unsubscribe(queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-@router.get("/leaderboard/{exercise_id}")
-async def get_leaderboard_by_exercise(
+@router.get("/leaderboard/{exercise_id}", response_model=List[LeaderboardEntry])
+def get_leaderboard_by_exercise(
     exercise_id: int,
-    limit: int = 50,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
     db: Session = Depends(get_db)
 ):
-    """根据题目获取挑战排行榜（兼容前端路径）"""
-    return await get_leaderboard(exercise_id=exercise_id, limit=limit, db=db)  # type: ignore
+    """单题排行榜：按最佳用时、通关时间排序，游标分页（下一页游标见响应头 X-Next-Cursor）"""
+    # 解析exercise_id（支持通过ID或sort_order查找）
+    actual_exercise_id = resolve_exercise_id(exercise_id, db)
+    
+    try:
+        entries, next_cursor = LeaderboardService(db).exercise_ranking(actual_exercise_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return entries
 
 @router.get("/{exercise_id}", response_model=Union[ChallengeMetaResponse, ChallengePageResponse])
-async def get_challenge(
+def get_challenge(
     exercise_id: int,
     page: Optional[int] = Query(None, ge=1, le=100),
     current_user: User = Depends(get_current_user),
@@ -244,15 +218,8 @@ async def get_challenge(
     ).first()
     
     if not challenge:
-        # 创建新挑战（一次性写入，后续仅做切片返回）
-        numbers, total_sum = generate_challenge_numbers(current_user.id, actual_exercise_id)
-        
-        challenge = Challenge(
-            user_id=current_user.id,
-            exercise_id=actual_exercise_id,
-            numbers_data=json.dumps(numbers),
-            total_sum=total_sum
-        )
+        # 创建新挑战（仅保存种子版本与答案，页面数据按需生成）
+        challenge = new_challenge(current_user.id, actual_exercise_id)
         db.add(challenge)
         db.commit()
         db.refresh(challenge)
@@ -264,15 +231,7 @@ async def get_challenge(
 
     # 如果携带 page 参数，则返回对应页的数据
     if page is not None:
-        # 旧数据兼容：如与新规则不一致则重建
-        numbers, _ = ensure_challenge_up_to_date(challenge, db)
-        page_numbers = numbers[page - 1]
-        return ChallengePageResponse(
-            page_number=page,
-            numbers=page_numbers,
-            start_index=(page - 1) * 10 + 1,
-            end_index=page * 10
-        )
+        return _page_response(challenge, page)
 
     # 默认仅返回元信息，避免回传 1000 条
     return ChallengeMetaResponse(
@@ -293,63 +252,64 @@ async def get_challenge_page(
     exercise_id: int,
     page_number: int,
     r: Optional[str] = Query(None, description="MD5参数，第一题需要"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """获取挑战页面数据"""
+    """获取挑战页面数据（每个挑战需翻 100 页，走异步会话）"""
     if page_number < 1 or page_number > 100:
         raise HTTPException(status_code=400, detail="页面编号必须在1-100之间")
     
     # 解析exercise_id（支持通过ID或sort_order查找）
-    actual_exercise_id = resolve_exercise_id(exercise_id, db)
+    actual_exercise_id = await resolve_exercise_id_async(exercise_id, db)
     
-    # 第一题需要MD5参数验证
-    if actual_exercise_id == 1:
-        if not r:
-            raise HTTPException(status_code=400, detail="第一题需要携带r参数")
-        
-        # 验证MD5参数
-        import hashlib
-        import time
-        
-        # 获取当前时间戳
-        current_timestamp = int(time.time())
-        
-        # 验证时间戳是否在合理范围内（5分钟内）
-        # 尝试当前时间戳和前5分钟的时间戳
-        md5_valid = False
-        for i in range(6):  # 检查当前时间和前5分钟
-            test_timestamp = current_timestamp - i * 60
-            test_raw_string = str(test_timestamp) + 'spider'
-            test_md5 = hashlib.md5(test_raw_string.encode('utf-8')).hexdigest()
-            if r == test_md5:
-                md5_valid = True
-                break
-        
-        if not md5_valid:
-            raise HTTPException(status_code=400, detail="MD5参数验证失败")
+    # 翻页访问校验（第一题需要MD5参数）
+    verify_page_access(actual_exercise_id, current_user, r)
     
     # 查找挑战数据
-    challenge = db.query(Challenge).filter(
-        Challenge.user_id == current_user.id,
-        Challenge.exercise_id == actual_exercise_id
-    ).first()
+    challenge = await get_user_challenge_async(current_user.id, actual_exercise_id, db)
     
     if not challenge:
         raise HTTPException(status_code=404, detail="挑战不存在")
     
-    numbers = json.loads(challenge.numbers_data)
-    page_numbers = numbers[page_number - 1]
+    # 旧数据兼容：转换为新格式后只生成请求的这一页
+    await ensure_challenge_up_to_date_async(challenge, db)
+    return _page_response(challenge, page_number)
+
+@router.get("/{exercise_id}/pages")
+async def get_challenge_pages(
+    exercise_id: int,
+    page_from: int = Query(1, alias="from", ge=1, le=TOTAL_PAGES),
+    page_to: int = Query(TOTAL_PAGES, alias="to", ge=1, le=TOTAL_PAGES),
+    r: Optional[str] = Query(None, description="MD5参数，第一题需要"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """批量获取挑战页面数据，以 NDJSON 流式返回（每行一个 ChallengePageResponse）"""
+    if page_from > page_to:
+        raise HTTPException(status_code=400, detail="from 不能大于 to")
     
-    return ChallengePageResponse(
-        page_number=page_number,
-        numbers=page_numbers,
-        start_index=(page_number - 1) * 10 + 1,
-        end_index=page_number * 10
-    )
+    # 解析exercise_id（支持通过ID或sort_order查找）
+    actual_exercise_id = await resolve_exercise_id_async(exercise_id, db)
+    
+    # 与单页接口相同的访问校验，只在开始时校验一次
+    verify_page_access(actual_exercise_id, current_user, r)
+    
+    # 查找挑战数据
+    challenge = await get_user_challenge_async(current_user.id, actual_exercise_id, db)
+    
+    if not challenge:
+        raise HTTPException(status_code=404, detail="挑战不存在")
+    
+    await ensure_challenge_up_to_date_async(challenge, db)
+    
+    def iter_pages():
+        for page_number in range(page_from, page_to + 1):
+            yield _page_response(challenge, page_number).model_dump_json() + "\n"
+    
+    return StreamingResponse(iter_pages(), media_type="application/x-ndjson")
 
 @router.get("/{exercise_id}/prepare")
-async def prepare_challenge(
+def prepare_challenge(
     exercise_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -358,14 +318,14 @@ async def prepare_challenge(
     # 解析exercise_id（支持通过ID或sort_order查找）
     actual_exercise_id = resolve_exercise_id(exercise_id, db)
     
-    validator = get_validator_for_exercise(actual_exercise_id)
-    if validator:
-        return validator.get_public_params(user=current_user, exercise_id=actual_exercise_id)
-    # 默认返回空参数
-    return {"version": "1.0.0"}
+    # 没有验证器的题目返回默认参数
+    return get_public_params(actual_exercise_id, user=current_user)
 
-@router.post("/submit")
-async def submit_challenge(
+@router.post("/submit", dependencies=[
+    Depends(RateLimiter("challenge_submit_user", capacity=20, per_seconds=60, by="user")),
+    Depends(RateLimiter("challenge_submit_ip", capacity=120, per_seconds=60, by="ip")),
+])
+def submit_challenge(
     submission: ChallengeSubmissionSchema,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -384,7 +344,9 @@ async def submit_challenge(
         raise HTTPException(status_code=404, detail="挑战不存在")
     
     # 通过校验器验证（如存在）
-    is_correct = submission.answer == challenge.total_sum
+    challenge_id = challenge.id
+    total_sum = challenge.total_sum
+    is_correct = submission.answer == total_sum
     validator = get_validator_for_exercise(actual_exercise_id)
     if validator:
         try:
@@ -398,45 +360,41 @@ async def submit_challenge(
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"校验失败: {str(e)}")
     
-    # 记录提交
-    submission_record = ChallengeSubmission(
-        challenge_id=challenge.id,
-        user_id=current_user.id,
-        exercise_id=actual_exercise_id,
+    # 记录提交并更新挑战状态（条件更新，避免并发重复计数）
+    result = ChallengeService(db).record_submission(
+        challenge,
         answer=submission.answer,
         time_spent=submission.time_spent,
-        is_correct=is_correct
+        is_correct=is_correct,
     )
     
-    # 更新挑战状态
-    challenge.attempts += 1
-    
-    if is_correct and not challenge.is_completed:
-        challenge.is_completed = True
-        challenge.completed_at = datetime.utcnow()
-        challenge.best_time = submission.time_spent
-        # 根据难度和用时计算积分
-        base_score = 100  # 基础积分
-        time_bonus = max(0, 300 - submission.time_spent) // 10  # 时间奖励
-        challenge.score = base_score + time_bonus
-        submission_record.score = challenge.score
-
-        # 同步更新题目统计：首次通关才累计成功人数
-        exercise = db.query(Exercise).filter(Exercise.id == actual_exercise_id).first()
-        if exercise:
-            exercise.success_count = (exercise.success_count or 0) + 1
-            exercise.attempt_count = (exercise.attempt_count or 0) + 1
-            db.add(exercise)
-    
-    db.add(submission_record)
-    db.commit()
+    # 首次通关时增量更新排行榜（失败不影响提交，可用 rebuild_leaderboard.py 校正）
+    if result.newly_completed:
+        try:
+            get_leaderboard_store().record_completion(current_user.id, result.score, result.completed_at)
+        except Exception as e:
+            logging.getLogger("uvicorn.error").warning("Failed to update leaderboard: %s", e)
+        
+        # 推送到最近通关动态
+        exercise_title = db.query(Exercise.title).filter(Exercise.id == actual_exercise_id).scalar()
+        completion_feed.publish({
+            "challenge_id": challenge_id,
+            "completed_at": result.completed_at.isoformat(),
+            "score": result.score or 0,
+            "user_id": current_user.id,
+            "username": current_user.username,
+            "full_name": current_user.full_name,
+            "avatar_url": current_user.avatar_url,
+            "exercise_id": actual_exercise_id,
+            "exercise_title": exercise_title,
+        })
     
     return {
         "success": True,
         "message": "恭喜！答案正确！" if is_correct else "答案错误，请重新尝试",
         "is_correct": is_correct,
-        "correct_answer": challenge.total_sum if not is_correct else None,
-        "score": challenge.score if is_correct else None,
-        "completed_at": challenge.completed_at.isoformat() if challenge.is_completed else None
+        "correct_answer": total_sum if not is_correct else None,
+        "score": result.score if is_correct else None,
+        "completed_at": result.completed_at.isoformat() if result.completed_at else None
     }
 
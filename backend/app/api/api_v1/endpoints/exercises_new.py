@@ -6,39 +6,72 @@ from app.core.database import get_db
 from app.api.api_v1.endpoints.auth import get_current_user_optional
 from app.models.user import User
 from app.services.exercise_service import ExerciseService
-from app.schemas.exercise import Exercise, ExerciseCreate, ExerciseUpdate, ExerciseSubmission, ExerciseSubmissionCreate
+from app.services.exercise_catalog import parse_tag_filter
+from app.services.exercise_search import exercise_search_index
+from app.schemas.exercise import (
+    Exercise, ExerciseCreate, ExerciseUpdate, ExerciseSubmission, ExerciseSubmissionCreate,
+    ExerciseSearchHit, ExerciseSearchResponse, ExerciseStatistics, ExerciseFacets, UserExerciseProgress,
+)
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Exercise])
-async def list_exercises(
+def list_exercises(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     difficulty: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
     sort_by: str = Query("sort_order"),
+    tags: Optional[str] = Query(None, description="标签筛选，多个标签用逗号分隔，需全部命中"),
     current_user: Optional[User] = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
 ):
     """获取题目列表"""
     service = ExerciseService(db)
     exercises = service.get_all(skip=skip, limit=limit, difficulty=difficulty, 
-                              search=search, sort_by=sort_by)
+                              search=search, sort_by=sort_by, tags=parse_tag_filter(tags))
     return exercises
 
 @router.get("/count")
-async def count_exercises(
+def count_exercises(
     difficulty: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
+    tags: Optional[str] = Query(None, description="标签筛选，多个标签用逗号分隔，需全部命中"),
     db: Session = Depends(get_db)
 ):
     """获取符合筛选条件的题目总数（用于分页）"""
     service = ExerciseService(db)
-    total = service.get_count(difficulty=difficulty, search=search)
+    total = service.get_count(difficulty=difficulty, search=search, tags=parse_tag_filter(tags))
     return {"total": total}
 
+@router.get("/facets", response_model=ExerciseFacets)
+def get_exercise_facets(
+    difficulty: Optional[str] = Query(None),
+    search: Optional[str] = Query(None),
+    tags: Optional[str] = Query(None, description="标签筛选，多个标签用逗号分隔，需全部命中"),
+    db: Session = Depends(get_db)
+):
+    """当前筛选条件下各标签、各难度的题目数（放在 /{exercise_id} 之前）"""
+    service = ExerciseService(db)
+    return service.get_facets(difficulty=difficulty, search=search, tags=parse_tag_filter(tags))
+
+@router.get("/search", response_model=ExerciseSearchResponse)
+def search_exercises(
+    q: str = Query(..., min_length=1, max_length=100, description="检索词，匹配标题、描述、挑战要点与标签"),
+    difficulty: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """题目全文检索（按相关度排序，放在 /{exercise_id} 之前）"""
+    total, hits = exercise_search_index.search(db, q, skip=skip, limit=limit, difficulty=difficulty)
+    return {
+        "total": total,
+        "items": [ExerciseSearchHit(**hit.exercise.model_dump(), score=hit.score) for hit in hits],
+    }
+
 @router.get("/{exercise_id}", response_model=Exercise)
-async def get_exercise_by_id(
+def get_exercise_by_id(
     exercise_id: int,
     db: Session = Depends(get_db)
 ):
@@ -49,15 +82,15 @@ async def get_exercise_by_id(
         raise HTTPException(status_code=404, detail="题目不存在")
     return exercise
 
-@router.get("/statistics/overview")
-async def get_exercise_statistics(db: Session = Depends(get_db)):
+@router.get("/statistics/overview", response_model=ExerciseStatistics)
+def get_exercise_statistics(db: Session = Depends(get_db)):
     """获取题目统计信息"""
     service = ExerciseService(db)
     stats = service.get_statistics()
     return stats
 
 @router.post("/{exercise_id}/submit", response_model=ExerciseSubmission)
-async def submit_exercise_answer(
+def submit_exercise_answer(
     exercise_id: int,
     submission_data: ExerciseSubmissionCreate,
     current_user: User = Depends(get_current_user_optional),
@@ -79,8 +112,8 @@ async def submit_exercise_answer(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/user/progress")
-async def get_user_progress(
+@router.get("/user/progress", response_model=UserExerciseProgress)
+def get_user_progress(
     current_user: User = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
 ):
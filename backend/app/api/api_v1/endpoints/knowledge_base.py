@@ -24,7 +24,7 @@ router = APIRouter()
 
 # 题库管理
 @router.get("/banks", response_model=List[QuestionBank])
-async def get_question_banks(
+def get_question_banks(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: User = Depends(get_current_user),
@@ -36,7 +36,7 @@ async def get_question_banks(
 
 
 @router.post("/banks", response_model=QuestionBank)
-async def create_question_bank(
+def create_question_bank(
     bank_data: QuestionBankCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -47,7 +47,7 @@ async def create_question_bank(
 
 
 @router.get("/banks/{bank_id}", response_model=QuestionBank)
-async def get_question_bank(
+def get_question_bank(
     bank_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -61,7 +61,7 @@ async def get_question_bank(
 
 
 @router.put("/banks/{bank_id}", response_model=QuestionBank)
-async def update_question_bank(
+def update_question_bank(
     bank_id: int,
     bank_data: QuestionBankUpdate,
     current_user: User = Depends(get_current_user),
@@ -76,7 +76,7 @@ async def update_question_bank(
 
 
 @router.delete("/banks/{bank_id}")
-async def delete_question_bank(
+def delete_question_bank(
     bank_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -91,7 +91,7 @@ async def delete_question_bank(
 
 # 题目管理
 @router.get("/banks/{bank_id}/questions", response_model=List[Question])
-async def get_questions(
+def get_questions(
     bank_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -104,7 +104,7 @@ async def get_questions(
 
 
 @router.post("/banks/{bank_id}/questions", response_model=Question)
-async def create_question(
+def create_question(
     bank_id: int,
     question_data: QuestionCreate,
     current_user: User = Depends(get_current_user),
@@ -117,7 +117,7 @@ async def create_question(
 
 
 @router.get("/questions/{question_id}", response_model=Question)
-async def get_question(
+def get_question(
     question_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -131,7 +131,7 @@ async def get_question(
 
 
 @router.put("/questions/{question_id}", response_model=Question)
-async def update_question(
+def update_question(
     question_id: int,
     question_data: QuestionUpdate,
     current_user: User = Depends(get_current_user),
@@ -146,7 +146,7 @@ async def update_question(
 
 
 @router.delete("/questions/{question_id}")
-async def delete_question(
+def delete_question(
     question_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -161,7 +161,7 @@ async def delete_question(
 
 # 考试功能
 @router.post("/exam/setup", response_model=ExamSession)
-async def setup_exam(
+def setup_exam(
     setup_data: ExamSetupRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -189,7 +189,7 @@ async def setup_exam(
 
 
 @router.post("/practice/setup", response_model=ExamSession)
-async def setup_practice(
+def setup_practice(
     setup_data: PracticeSetupRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -214,7 +214,7 @@ async def setup_practice(
 
 
 @router.get("/sessions/{session_id}/questions", response_model=List[Question])
-async def get_session_questions(
+def get_session_questions(
     session_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -249,7 +249,7 @@ async def get_session_questions(
 
 
 @router.post("/sessions/{session_id}/submit", response_model=UserAnswer)
-async def submit_answer(
+def submit_answer(
     session_id: str,
     answer_data: UserAnswerCreate,
     current_user: User = Depends(get_current_user),
@@ -277,7 +277,7 @@ async def submit_answer(
 
 
 @router.post("/sessions/{session_id}/complete", response_model=ExamResult)
-async def complete_exam(
+def complete_exam(
     session_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -313,7 +313,7 @@ async def complete_exam(
 
 # 错题集
 @router.get("/wrong-questions", response_model=List[WrongQuestionDetail])
-async def get_wrong_questions(
+def get_wrong_questions(
     bank_id: Optional[int] = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -325,7 +325,7 @@ async def get_wrong_questions(
 
 
 @router.post("/wrong-questions/{wrong_question_id}/master")
-async def master_question(
+def master_question(
     wrong_question_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -339,7 +339,7 @@ async def master_question(
 
 
 @router.delete("/wrong-questions/{wrong_question_id}")
-async def delete_wrong_question(
+def delete_wrong_question(
     wrong_question_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -354,7 +354,7 @@ async def delete_wrong_question(
 
 # 学习统计
 @router.get("/stats", response_model=StudyStatsSummary)
-async def get_study_stats(
+def get_study_stats(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -365,7 +365,7 @@ async def get_study_stats(
 
 
 @router.get("/stats/{bank_id}", response_model=StudyStats)
-async def get_bank_stats(
+def get_bank_stats(
     bank_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
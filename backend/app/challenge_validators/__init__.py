@@ -1,7 +1,13 @@
 from typing import Protocol, Any, Dict
 
 
+class PageAccessDenied(Exception):
+    """翻页请求未通过校验，异常信息直接作为接口错误返回"""
+
+
 class Validator(Protocol):
+    """验证器必须实现的接口"""
+
     def get_public_params(self, user: Any, exercise_id: int) -> Dict[str, Any]:
         ...
 
@@ -15,3 +21,31 @@ class Validator(Protocol):
         ...
 
 
+# 以下为可选扩展：验证器按需实现，注册表与脚本通过 getattr 探测，未实现时使用默认行为
+
+
+class CachedPublicParams(Protocol):
+    # 公开参数与用户无关时设置为缓存时间桶长度（秒）；未声明或为 0 时每次重新计算
+    public_params_ttl: int
+
+
+class PageGuard(Protocol):
+    def guard_page_request(
+        self,
+        user: Any,
+        exercise_id: int,
+        params: Dict[str, Any],
+    ) -> None:
+        """翻页请求校验，不通过时抛出 PageAccessDenied；未实现则不做限制"""
+        ...
+
+
+class ExampleSubmissionProvider(Protocol):
+    def example_submission(
+        self,
+        exercise_id: int,
+        public_params: Dict[str, Any],
+        valid: bool = True,
+    ) -> Dict[str, Any]:
+        """构造示例提交（valid=False 时为无效提交），供 bench_validators.py 使用；未实现则跳过基准测试"""
+        ...
@@ -8,6 +8,9 @@ from .. import Validator
 class ExerciseTemplateValidator:
     """题目模板验证器"""
     
+    # 可选扩展 CachedPublicParams：公开参数与用户无关时，声明缓存时间桶（秒），同一时间桶内复用；需要按用户生成时删除
+    public_params_ttl = 10
+    
     def get_public_params(self, user: Any, exercise_id: int) -> Dict[str, Any]:
         """返回公开参数"""
         timestamp = int(time.time())
@@ -19,6 +22,15 @@ class ExerciseTemplateValidator:
             # 添加其他公开参数
         }
     
+    def guard_page_request(self, user: Any, exercise_id: int, params: Dict[str, Any]) -> None:
+        """翻页请求校验（可选扩展 PageGuard）
+
+        默认实现不做任何限制，与不定义此方法的效果相同；
+        需要限制翻页时在这里检查 params，不通过时抛出 PageAccessDenied，
+        例如：if not params.get('r'): raise PageAccessDenied("缺少翻页参数")
+        """
+        return None
+    
     def validate(self, submission: Any, user: Any, exercise_id: int, public_params: Dict[str, Any]) -> bool:
         """验证提交"""
         try:
@@ -54,6 +66,12 @@ class ExerciseTemplateValidator:
             print(f"Exercise template validation error: {e}")
             return False
     
+    def example_submission(self, exercise_id: int, public_params: Dict[str, Any], valid: bool = True) -> Dict[str, Any]:
+        """构造示例提交（可选扩展 ExampleSubmissionProvider，供 bench_validators.py 使用），valid=False 时返回无效提交"""
+        payload = {"answer": 0, "timeSpent": 60, "timestamp": int(time.time())}
+        payload["sign"] = self._generate_sign(payload) if valid else "invalid"
+        return {"exercise_id": exercise_id, "answer": 0, "time_spent": 60, "payload": payload}
+    
     def _generate_sign(self, payload: Dict[str, Any]) -> str:
         """生成签名"""
         # 在这里实现签名逻辑
@@ -2,11 +2,18 @@
 import hashlib
 import time
 from typing import Any, Dict
-from .. import Validator
+from .. import Validator, PageAccessDenied
+from ..guards import Md5TokenWindow
+
+# 翻页参数 r = MD5(timestamp + 'spider')，5分钟内有效
+PAGE_TOKEN_WINDOW = Md5TokenWindow(salt='spider', window=300)
 
 class Exercise1Validator:
     """第一题验证器：MD5参数验证"""
     
+    # 公开参数与用户无关，同一 10 秒时间桶内复用（时间戳最多滞后 10 秒，仍在 5 分钟有效期内）
+    public_params_ttl = 10
+    
     def get_public_params(self, user: Any, exercise_id: int) -> Dict[str, Any]:
         """返回公开参数"""
         timestamp = int(time.time())
@@ -51,4 +58,24 @@ class Exercise1Validator:
             
         except Exception as e:
             print(f"Exercise 1 validation error: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def example_submission(self, exercise_id: int, public_params: Dict[str, Any], valid: bool = True) -> Dict[str, Any]:
+        """构造示例提交（供基准测试使用）"""
+        timestamp = int(time.time())
+        md5_param = hashlib.md5(f"{timestamp}spider".encode('utf-8')).hexdigest() if valid else "0" * 32
+        return {
+            "exercise_id": exercise_id,
+            "answer": 0,
+            "time_spent": 60,
+            "payload": {"timestamp": timestamp, "md5Param": md5_param},
+        }
+    
+    def guard_page_request(self, user: Any, exercise_id: int, params: Dict[str, Any]) -> None:
+        """翻页请求需携带 MD5 参数 r"""
+        r = params.get('r')
+        if not r:
+            raise PageAccessDenied("第一题需要携带r参数")
+        
+        if not PAGE_TOKEN_WINDOW.is_valid(r):
+            raise PageAccessDenied("MD5参数验证失败")
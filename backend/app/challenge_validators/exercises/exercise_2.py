@@ -7,6 +7,9 @@ from .. import Validator
 class Exercise2Validator:
     """第二题验证器：动态字体验证"""
     
+    # encodingKey 只随时间戳变化，按 10 秒时间桶缓存
+    public_params_ttl = 10
+    
     def get_public_params(self, user: Any, exercise_id: int) -> Dict[str, Any]:
         """返回公开参数"""
         timestamp = int(time.time())
@@ -57,6 +60,19 @@ class Exercise2Validator:
             print(f"Exercise 2 validation error: {e}")
             return False
     
+    def example_submission(self, exercise_id: int, public_params: Dict[str, Any], valid: bool = True) -> Dict[str, Any]:
+        """构造示例提交（供基准测试使用）"""
+        timestamp = int(time.time())
+        answer = self._calculate_expected_answer(timestamp)
+        payload = {
+            "answer": answer,
+            "timeSpent": 60,
+            "timestamp": timestamp,
+            "encodingKey": f"dynamic_{timestamp}",
+        }
+        payload["sign"] = self._generate_sign(payload) if valid else "0" * 64
+        return {"exercise_id": exercise_id, "answer": answer, "time_spent": 60, "payload": payload}
+    
     def _generate_sign(self, payload: Dict[str, Any]) -> str:
         """生成签名"""
         # 动态字体签名逻辑
@@ -7,6 +7,9 @@ from .. import Validator
 class Exercise3Validator:
     """第三题验证器：加密字体验证"""
     
+    # 除时间戳外参数固定，按 10 秒时间桶缓存
+    public_params_ttl = 10
+    
     def get_public_params(self, user: Any, exercise_id: int) -> Dict[str, Any]:
         """返回公开参数"""
         timestamp = int(time.time())
@@ -56,6 +59,14 @@ class Exercise3Validator:
             print(f"Exercise 3 validation error: {e}")
             return False
     
+    def example_submission(self, exercise_id: int, public_params: Dict[str, Any], valid: bool = True) -> Dict[str, Any]:
+        """构造示例提交（供基准测试使用）"""
+        shift = public_params.get('shift', 13)
+        answer = self._calculate_expected_answer(shift)
+        payload = {"answer": answer, "timeSpent": 60, "timestamp": int(time.time())}
+        payload["sign"] = self._generate_sign(payload, shift) if valid else "0" * 64
+        return {"exercise_id": exercise_id, "answer": answer, "time_spent": 60, "payload": payload}
+    
     def _generate_sign(self, payload: Dict[str, Any], shift: int) -> str:
         """生成签名"""
         # 加密字体签名逻辑
@@ -0,0 +1,50 @@
+import hashlib
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+
+class Md5TokenWindow:
+    """滚动预计算的 MD5(timestamp + salt) 令牌窗口
+
+    每秒只计算一次摘要并放入集合，过期的时间戳随窗口滑动移除，
+    校验时只需一次集合查找。
+    """
+
+    def __init__(self, salt: str, window: int = 300, max_skew: int = 30):
+        self._salt = salt
+        self._window = window  # 允许的历史时间范围（秒）
+        self._max_skew = max_skew  # 允许客户端时钟超前的范围（秒）
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, int] = {}
+        self._order: Deque[Tuple[int, str]] = deque()
+        self._last: Optional[int] = None
+
+    def token_for(self, timestamp: int) -> str:
+        raw_string = str(timestamp) + self._salt
+        return hashlib.md5(raw_string.encode('utf-8')).hexdigest()
+
+    def _advance(self, now: int) -> None:
+        oldest = now - self._window
+        newest = now + self._max_skew
+
+        start = oldest if self._last is None else max(self._last + 1, oldest)
+        for timestamp in range(start, newest + 1):
+            token = self.token_for(timestamp)
+            self._tokens[token] = timestamp
+            self._order.append((timestamp, token))
+        if self._last is None or newest > self._last:
+            self._last = newest
+
+        while self._order and self._order[0][0] < oldest:
+            _, token = self._order.popleft()
+            self._tokens.pop(token, None)
+
+    def is_valid(self, token: str, now: Optional[int] = None) -> bool:
+        if now is None:
+            now = int(time.time())
+        with self._lock:
+            self._advance(now)
+            timestamp = self._tokens.get(token)
+        return timestamp is not None and now - self._window <= timestamp <= now + self._max_skew
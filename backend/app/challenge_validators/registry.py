@@ -1,31 +1,127 @@
-from typing import Dict, Optional
+import importlib
+import logging
+import pkgutil
+import re
+import threading
+import time
+from importlib.metadata import entry_points
+from typing import Any, Dict, Optional, Tuple
 from . import Validator
-from .exercises.exercise_1 import Exercise1Validator
-from .exercises.exercise_2 import Exercise2Validator
-from .exercises.exercise_3 import Exercise3Validator
+from . import exercises as exercises_package
 
+# 第三方包可通过该入口点组提供验证器：名称为题目ID，值为 "模块:类"
+ENTRY_POINT_GROUP = "crawler_platform.challenge_validators"
 
-_REGISTRY: Dict[int, Validator] = {}
+# exercises/ 目录下的 exercise_<题目ID>.py（或同名包），类名为 Exercise<题目ID>Validator
+_MODULE_PATTERN = re.compile(r"^exercise_(\d+)$")
+
+DEFAULT_PUBLIC_PARAMS = {"version": "1.0.0"}
+
+_lock = threading.Lock()
+_REGISTRY: Dict[int, Optional[Validator]] = {}
+_SOURCES: Optional[Dict[int, str]] = None
+
+# 公开参数缓存：题目ID -> (时间桶, 参数)，每道题只保留当前时间桶
+_PUBLIC_PARAMS_CACHE: Dict[int, Tuple[int, Dict[str, Any]]] = {}
 
 
 def register_validator(exercise_id: int, validator: Validator) -> None:
-    _REGISTRY[exercise_id] = validator
+    with _lock:
+        _REGISTRY[exercise_id] = validator
+        _PUBLIC_PARAMS_CACHE.pop(exercise_id, None)
+
+
+def discover_validators() -> Dict[int, str]:
+    """列出可用的验证器来源（题目ID -> 模块路径），只扫描文件名与入口点，不导入模块"""
+    sources: Dict[int, str] = {}
+    for module_info in pkgutil.iter_modules(exercises_package.__path__):
+        match = _MODULE_PATTERN.match(module_info.name)
+        if match:
+            sources[int(match.group(1))] = f"{exercises_package.__name__}.{module_info.name}"
+
+    try:
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            if entry_point.name.isdigit():
+                # 入口点优先于内置目录，便于外部包覆盖
+                sources[int(entry_point.name)] = entry_point.value
+    except Exception as e:
+        logging.getLogger("uvicorn.error").warning("Failed to read validator entry points: %s", e)
+    return sources
+
+
+def _get_sources() -> Dict[int, str]:
+    global _SOURCES
+    if _SOURCES is None:
+        _SOURCES = discover_validators()
+    return _SOURCES
+
+
+def _load_validator(exercise_id: int, source: str) -> Validator:
+    module_name, _, class_name = source.partition(":")
+    module = importlib.import_module(module_name)
+    validator_class = getattr(module, class_name or f"Exercise{exercise_id}Validator")
+    return validator_class()
 
 
 def get_validator_for_exercise(exercise_id: int) -> Optional[Validator]:
-    return _REGISTRY.get(exercise_id)
+    """获取题目验证器，首次使用时才导入对应模块；没有验证器的题目返回 None"""
+    if exercise_id in _REGISTRY:
+        return _REGISTRY[exercise_id]
+
+    with _lock:
+        if exercise_id in _REGISTRY:
+            return _REGISTRY[exercise_id]
 
+        validator = None
+        source = _get_sources().get(exercise_id)
+        if source is not None:
+            try:
+                validator = _load_validator(exercise_id, source)
+            except Exception as e:
+                logging.getLogger("uvicorn.error").exception(
+                    "Failed to load validator for exercise %s from %s: %s", exercise_id, source, e
+                )
+        _REGISTRY[exercise_id] = validator
+        return validator
 
-def auto_register_validators():
-    """自动注册所有验证器"""
-    # 注册题目验证器
-    register_validator(1, Exercise1Validator())
-    register_validator(2, Exercise2Validator())
-    register_validator(3, Exercise3Validator())
-    
-    # 可以在这里添加更多验证器
-    # register_validator(4, Exercise4Validator())
-    # register_validator(5, Exercise5Validator())
+
+def get_public_params(exercise_id: int, user: Any) -> Dict[str, Any]:
+    """获取题目公开参数
+
+    验证器声明了 public_params_ttl（秒）时，公开参数与用户无关，
+    同一时间桶内的请求共用一次计算结果；否则每次调用 get_public_params。
+    """
+    validator = get_validator_for_exercise(exercise_id)
+    if validator is None:
+        return dict(DEFAULT_PUBLIC_PARAMS)
+
+    ttl = getattr(validator, "public_params_ttl", 0)
+    if not ttl:
+        return validator.get_public_params(user=user, exercise_id=exercise_id)
+
+    bucket = int(time.time()) // ttl
+    cached = _PUBLIC_PARAMS_CACHE.get(exercise_id)
+    if cached is None or cached[0] != bucket:
+        cached = (bucket, validator.get_public_params(user=user, exercise_id=exercise_id))
+        _PUBLIC_PARAMS_CACHE[exercise_id] = cached
+    return dict(cached[1])
+
+
+def guard_page_request(exercise_id: int, user: Any, params: Dict[str, Any]) -> None:
+    """调用题目校验器的翻页校验（如有），不通过时抛出 PageAccessDenied"""
+    validator = get_validator_for_exercise(exercise_id)
+    guard = getattr(validator, "guard_page_request", None)
+    if guard is not None:
+        guard(user=user, exercise_id=exercise_id, params=params)
+
+
+def reset_registry() -> None:
+    """清空已加载的验证器与来源列表，下次使用时重新发现（新增题目模块后调用）"""
+    global _SOURCES
+    with _lock:
+        _REGISTRY.clear()
+        _PUBLIC_PARAMS_CACHE.clear()
+        _SOURCES = None
 
 
 # Example default validator (no-op)
@@ -36,8 +132,3 @@ class NoopValidator:
     def validate(self, submission, user, exercise_id: int, public_params):
         # fall back to default numeric sum correctness (handled outside)
         return True
-
-
-# 自动注册验证器
-auto_register_validators()
-
@@ -19,6 +19,16 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f"mysql+pymysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_SERVER}:{self.MYSQL_PORT}/{self.MYSQL_DB}"
     
+    # 异步驱动连接串，为空时使用 aiomysql 连接上面的 MySQL；
+    # 本地测试可设置为 sqlite+aiosqlite:///./test.db
+    ASYNC_DB_URL: str = ""
+    
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        if self.ASYNC_DB_URL:
+            return self.ASYNC_DB_URL
+        return f"mysql+aiomysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_SERVER}:{self.MYSQL_PORT}/{self.MYSQL_DB}"
+    
     # JWT配置
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
@@ -34,6 +44,26 @@ class Settings(BaseSettings):
     
     # Redis配置
     REDIS_URL: str = "redis://localhost:6379"
+    REDIS_ENABLED: bool = True  # 关闭后排行榜等功能使用进程内实现
+    
+    # 接口限流（令牌桶，优先使用 Redis）
+    RATE_LIMIT_ENABLED: bool = True
+    # 受信任的反向代理（IP 或网段），只有直连地址属于其中时才读取 X-Forwarded-For
+    TRUSTED_PROXIES: List[str] = []
+    
+    # 提交日志（challenge_submissions / user_answers）延迟批量写入
+    WRITE_BEHIND_ENABLED: bool = False
+    WRITE_BEHIND_FLUSH_MS: int = 200  # 最长写入间隔（毫秒）
+    WRITE_BEHIND_BATCH_SIZE: int = 500  # 攒满多少行立即写入
+    WRITE_BEHIND_QUEUE_SIZE: int = 10000  # 队列上限，超出后同步写入
+    
+    # 访问次数缓冲写入间隔（秒）
+    VIEW_COUNT_FLUSH_SECONDS: int = 10
+    
+    # 进程内题目缓存的最长有效期（秒），多 worker 部署时兜底刷新
+    EXERCISE_CACHE_TTL: int = 300
+    # 题目统计缓存有效期（秒），尝试/通关次数在此时间内刷新
+    EXERCISE_STATS_TTL: int = 60
     
     class Config:
         env_file = ".env"
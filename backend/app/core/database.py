@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -14,6 +15,10 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# 异步引擎在首次使用时创建（创建时才需要导入异步驱动）
+async_engine = None
+AsyncSessionLocal = None
+
 def get_db():
     db = SessionLocal()
     try:
@@ -21,3 +26,29 @@ def get_db():
     finally:
         db.close()
 
+def get_async_engine():
+    global async_engine, AsyncSessionLocal
+    if async_engine is None:
+        async_engine = create_async_engine(
+            settings.ASYNC_DATABASE_URL,
+            pool_pre_ping=True,
+            pool_recycle=300,
+            echo=False
+        )
+        AsyncSessionLocal = async_sessionmaker(
+            async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+    return async_engine
+
+async def get_async_db():
+    """异步会话依赖：查询在事件循环中等待 IO，不阻塞其他请求"""
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_async_engine():
+    global async_engine, AsyncSessionLocal
+    if async_engine is not None:
+        await async_engine.dispose()
+        async_engine = None
+        AsyncSessionLocal = None
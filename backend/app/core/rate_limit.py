@@ -0,0 +1,201 @@
+import ipaddress
+import logging
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from jose import JWTError, jwt
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+KEY_PREFIX = "ratelimit"
+
+# 令牌桶：按距上次请求的时间补充令牌，取一个令牌成功即放行。
+# 使用 Redis 服务器时间，多实例部署时各节点看到的时钟一致。
+# 返回 {是否放行, 需等待的秒数}（浮点数以字符串返回，避免被 Redis 截断为整数）
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(retry_after)}
+"""
+
+
+class MemoryTokenBuckets:
+    """进程内令牌桶（Redis 不可用时兜底，仅对单个 worker 生效）"""
+
+    def __init__(self, max_keys: int = 10000):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._max_keys = max_keys
+
+    def acquire(self, key: str, capacity: int, rate: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, (1 - tokens) / rate
+            if len(self._buckets) > self._max_keys:
+                self._prune(now, capacity / rate)
+        return allowed, retry_after
+
+    def _prune(self, now: float, idle_seconds: float) -> None:
+        # 空闲足够久的桶已经补满，删除后与新建等价
+        self._buckets = {
+            key: value for key, value in self._buckets.items()
+            if now - value[1] < idle_seconds
+        }
+
+
+class RedisTokenBuckets:
+    """基于 Redis Lua 脚本的令牌桶，多个 worker / 实例共享限额"""
+
+    def __init__(self, client):
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def acquire(self, key: str, capacity: int, rate: float) -> Tuple[bool, float]:
+        allowed, retry_after = self._script(keys=[f"{KEY_PREFIX}:{key}"], args=[capacity, rate])
+        return int(allowed) == 1, float(retry_after)
+
+
+_memory_buckets = MemoryTokenBuckets()
+_redis_buckets: Optional[RedisTokenBuckets] = None
+
+
+def _get_buckets():
+    global _redis_buckets
+    client = get_redis()
+    if client is None:
+        return _memory_buckets
+    if _redis_buckets is None:
+        _redis_buckets = RedisTokenBuckets(client)
+    return _redis_buckets
+
+
+def _parse_networks(values):
+    networks = []
+    for value in values:
+        try:
+            networks.append(ipaddress.ip_network(value.strip(), strict=False))
+        except ValueError:
+            logging.getLogger("uvicorn.error").warning("Ignoring invalid trusted proxy: %s", value)
+    return networks
+
+
+_trusted_proxies = _parse_networks(settings.TRUSTED_PROXIES)
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_proxies)
+
+
+def client_ip(request: Request) -> str:
+    """获取客户端 IP
+
+    默认使用直连地址；只有直连地址是受信任的代理（TRUSTED_PROXIES）时才读取 X-Forwarded-For，
+    并从右向左跳过受信任的代理，取第一个不受信任的地址（客户端可以伪造最左侧的值）。
+    """
+    peer = request.client.host if request.client else "unknown"
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded or not _is_trusted_proxy(peer):
+        return peer
+
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    # 全部为受信任的代理：取最早的一跳
+    return hops[0] if hops else peer
+
+
+def token_user_id(request: Request) -> Optional[str]:
+    """从登录 Cookie 中解析用户ID，只校验签名，不查询数据库"""
+    token = request.cookies.get("access_token")
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    user_id = payload.get("sub")
+    return str(user_id) if user_id is not None else None
+
+
+class RateLimiter:
+    """按路由声明的令牌桶限流依赖，超限时返回 429 并带 Retry-After
+
+    用法：
+        @router.post("/login", dependencies=[Depends(RateLimiter("login", capacity=10, per_seconds=60))])
+
+    by="ip" 按客户端 IP 计数；by="user" 按登录用户计数（未登录时退化为 IP）。
+    同一路由可叠加多个限流器，例如同时限制单个用户与单个 IP。
+    """
+
+    def __init__(self, name: str, capacity: int, per_seconds: float, by: str = "ip"):
+        if by not in ("ip", "user"):
+            raise ValueError("by 只能为 ip 或 user")
+        self.name = name
+        self.capacity = capacity
+        self.rate = capacity / per_seconds
+        self.by = by
+
+    def key_for(self, request: Request) -> str:
+        if self.by == "user":
+            user_id = token_user_id(request)
+            if user_id is not None:
+                return f"user:{user_id}"
+        return f"ip:{client_ip(request)}"
+
+    def __call__(self, request: Request) -> None:
+        # 同步依赖：由 FastAPI 放到线程池执行，Redis 往返不阻塞事件循环
+        self.check(self.key_for(request))
+
+    def check(self, key: str) -> None:
+        """按给定的键取一个令牌，超限时抛出 429
+
+        用于键无法从请求头得到的场景（如登录时按提交的用户名限流），在线程池中调用。
+        """
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        key = f"{self.name}:{key}"
+        buckets = _get_buckets()
+        try:
+            allowed, retry_after = buckets.acquire(key, self.capacity, self.rate)
+        except Exception as e:
+            logging.getLogger("uvicorn.error").warning("Rate limit check failed, using in-process buckets: %s", e)
+            allowed, retry_after = _memory_buckets.acquire(key, self.capacity, self.rate)
+
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="请求过于频繁，请稍后再试",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
@@ -0,0 +1,39 @@
+import logging
+import threading
+
+from app.core.config import settings
+
+_lock = threading.Lock()
+_client = None
+_initialized = False
+
+
+def get_redis():
+    """返回可用的 Redis 客户端；未启用或连接失败时返回 None，由调用方使用进程内实现兜底"""
+    global _client, _initialized
+    if _initialized:
+        return _client
+
+    with _lock:
+        if _initialized:
+            return _client
+        _initialized = True
+
+        if not settings.REDIS_ENABLED:
+            return None
+
+        try:
+            import redis
+
+            client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                decode_responses=True,
+                socket_connect_timeout=1,
+                socket_timeout=1,
+            )
+            client.ping()
+            _client = client
+        except Exception as e:
+            logging.getLogger("uvicorn.error").warning("Redis unavailable, using in-process fallback: %s", e)
+            _client = None
+        return _client
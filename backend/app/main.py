@@ -3,6 +3,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.api_v1.api import api_router
 from app.models import Challenge, ChallengeSubmission  # 确保模型被导入
+from app.core.database import SessionLocal, dispose_async_engine
+from app.services.exercise_catalog import exercise_catalog, exercise_index
+from app.services.leaderboard_service import LeaderboardService
+from app.services.completion_feed import completion_feed
+from app.services.write_behind import start_write_behind, stop_write_behind
+from app.services.view_counter import start_view_counters, stop_view_counters
 import logging
 import json
 import os
@@ -23,6 +29,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # 包含API路由
@@ -36,6 +43,63 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+# 启动时预加载题目解析索引与题目快照，失败时在首次使用时再加载
+@app.on_event("startup")
+async def _load_exercise_index_on_startup():
+    db = SessionLocal()
+    try:
+        exercise_index.load(db)
+        exercise_catalog.load(db)
+    except Exception as e:
+        logging.getLogger("uvicorn.error").warning("Failed to load exercise index: %s", e)
+    finally:
+        db.close()
+
+# 启动时确保排行榜已加载（进程内存储或空的 Redis 需要从数据库重建）
+@app.on_event("startup")
+async def _load_leaderboard_on_startup():
+    db = SessionLocal()
+    try:
+        LeaderboardService(db).ensure_loaded()
+    except Exception as e:
+        logging.getLogger("uvicorn.error").warning("Failed to load leaderboard: %s", e)
+    finally:
+        db.close()
+
+# 启动时用最近通关记录初始化动态缓冲区
+@app.on_event("startup")
+async def _load_completion_feed_on_startup():
+    db = SessionLocal()
+    try:
+        completion_feed.load(db)
+    except Exception as e:
+        logging.getLogger("uvicorn.error").warning("Failed to load completion feed: %s", e)
+    finally:
+        db.close()
+
+# 提交日志延迟写入：启动后台写入线程，关闭时写入队列中剩余的数据
+@app.on_event("startup")
+async def _start_write_behind_on_startup():
+    start_write_behind()
+
+@app.on_event("shutdown")
+async def _flush_write_behind_on_shutdown():
+    stop_write_behind()
+
+# 访问次数缓冲：启动后台写入线程，关闭时写入剩余增量
+@app.on_event("startup")
+async def _start_view_counters_on_startup():
+    start_view_counters()
+
+@app.on_event("shutdown")
+async def _flush_view_counters_on_shutdown():
+    stop_view_counters()
+
+# 关闭异步引擎的连接池
+@app.on_event("shutdown")
+async def _dispose_async_engine_on_shutdown():
+    await dispose_async_engine()
+
 # 在启动时尝试预生成 OpenAPI，若失败会在控制台打印详细异常
 @app.on_event("startup")
 async def _generate_openapi_on_startup():
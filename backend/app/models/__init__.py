@@ -1,13 +1,14 @@
 from .user import User
-from .exercise import Exercise, ExerciseSubmission
-from .challenge import Challenge, ChallengeSubmission
+from .exercise import Exercise, ExerciseSubmission, ExerciseTag
+from .challenge import Challenge, ChallengeSubmission, UserChallengeSummary
 from .knowledge_base import (
     QuestionBank, Question, UserAnswer, WrongQuestion, 
     ExamSession, StudyStats
 )
 
 __all__ = [
-    "User", "Exercise", "ExerciseSubmission", "Challenge", "ChallengeSubmission",
+    "User", "Exercise", "ExerciseSubmission", "ExerciseTag", "Challenge", "ChallengeSubmission",
+    "UserChallengeSummary",
     "QuestionBank", "Question", "UserAnswer", "WrongQuestion", 
     "ExamSession", "StudyStats"
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -9,7 +9,8 @@ class Challenge(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     exercise_id = Column(Integer, ForeignKey("exercises.id"), nullable=False, index=True)
-    numbers_data = Column(Text, nullable=False)  # JSON格式存储1000个数字
+    numbers_data = Column(Text, nullable=True)  # 旧格式：JSON存储1000个数字；新格式为空，按页即时生成
+    data_version = Column(Integer, nullable=True)  # 数据格式版本，为空表示旧格式
     total_sum = Column(Integer, nullable=False)
     is_completed = Column(Boolean, nullable=False, default=False)
     completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -22,6 +23,11 @@ class Challenge(Base):
     # 关系
     user = relationship("User", back_populates="challenges")
     exercise = relationship("Exercise", back_populates="challenges")
+    
+    __table_args__ = (
+        # 单题排行榜：按用时、通关时间排序并做游标分页
+        Index("ix_challenges_exercise_ranking", "exercise_id", "is_completed", "best_time", "completed_at", "id"),
+    )
 
 class ChallengeSubmission(Base):
     __tablename__ = "challenge_submissions"
@@ -39,3 +45,16 @@ class ChallengeSubmission(Base):
     # 关系
     challenge = relationship("Challenge")
     user = relationship("User")
+
+
+class UserChallengeSummary(Base):
+    """用户挑战进度汇总，随提交在同一事务内增量维护"""
+    __tablename__ = "user_challenge_summary"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_score = Column(Integer, nullable=False, default=0)
+    solved_count = Column(Integer, nullable=False, default=0)
+    total_attempts = Column(Integer, nullable=False, default=0)  # 提交总次数
+    sum_best_time = Column(Integer, nullable=False, default=0)  # 已通关挑战用时之和（秒）
+    completed_exercise_ids = Column(Text, nullable=False, default="[]")  # JSON格式存储已通关题目ID
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
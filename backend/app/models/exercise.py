@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -23,13 +23,37 @@ class Exercise(Base):
     attempt_count = Column(Integer, nullable=False, default=0)  # 尝试次数
     success_count = Column(Integer, nullable=False, default=0)  # 成功次数
     avg_time = Column(Integer, nullable=True)  # 平均完成时间（秒）
+    p50_time = Column(Integer, nullable=True)  # 完成用时中位数（秒）
+    p90_time = Column(Integer, nullable=True)  # 完成用时 90 分位（秒）
+    p99_time = Column(Integer, nullable=True)  # 完成用时 99 分位（秒）
+    time_sketch = Column(Text, nullable=True)  # 完成用时分位数草图（DDSketch，JSON）
     
     # 关系
     submissions = relationship("ExerciseSubmission", back_populates="exercise")
     challenges = relationship("Challenge", back_populates="exercise")
+    tag_links = relationship("ExerciseTag", back_populates="exercise", cascade="all, delete-orphan")
+
+class ExerciseTag(Base):
+    """题目标签（规范化存储，与 exercises.tags 的 JSON 保持一致，用于按标签筛选与计数）"""
+    __tablename__ = "exercise_tags"
+    __table_args__ = (
+        UniqueConstraint("exercise_id", "tag", name="uq_exercise_tags_exercise_tag"),
+        # 按标签查找题目
+        Index("ix_exercise_tags_tag", "tag", "exercise_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    exercise_id = Column(Integer, ForeignKey("exercises.id"), nullable=False)
+    tag = Column(String(50), nullable=False)
+
+    exercise = relationship("Exercise", back_populates="tag_links")
 
 class ExerciseSubmission(Base):
     __tablename__ = "exercise_submissions"
+    __table_args__ = (
+        # 用户进度聚合只读该索引（按题目分组，统计答对次数与得分）
+        Index("ix_exercise_submissions_user_progress", "user_id", "exercise_id", "is_correct", "score"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     exercise_id = Column(Integer, ForeignKey("exercises.id"), nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -22,6 +22,10 @@ class QuestionBank(Base):
 class Question(Base):
     """题目表"""
     __tablename__ = "questions"
+    __table_args__ = (
+        # 题库列表按题库统计题目总数与各题型数量
+        Index("ix_questions_bank_type", "bank_id", "is_active", "type"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     bank_id = Column(Integer, ForeignKey("question_banks.id"), nullable=False, comment="题库ID")
@@ -61,7 +61,10 @@ class UserProgress(BaseModel):
 
 class LeaderboardEntry(BaseModel):
     rank: int
+    user_id: Optional[int] = None
     username: str
+    full_name: Optional[str] = None
+    avatar_url: Optional[str] = None
     score: int
     completed_at: Optional[str] = None
     time_spent: int
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, field_validator
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 import json
 
@@ -32,6 +32,9 @@ class ExerciseInDBBase(ExerciseBase):
     attempt_count: int
     success_count: int
     avg_time: Optional[int] = None
+    p50_time: Optional[int] = None
+    p90_time: Optional[int] = None
+    p99_time: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -51,6 +54,51 @@ class ExerciseInDBBase(ExerciseBase):
 class Exercise(ExerciseInDBBase):
     pass
 
+class ExerciseSearchHit(Exercise):
+    score: float  # BM25 相关度
+
+class ExerciseSearchResponse(BaseModel):
+    total: int
+    items: List[ExerciseSearchHit]
+
+class TagFacet(BaseModel):
+    tag: str
+    count: int
+
+class DifficultyFacet(BaseModel):
+    difficulty: str
+    count: int
+
+class ExerciseFacets(BaseModel):
+    total: int
+    tags: List[TagFacet]  # 按题目数降序
+    difficulties: List[DifficultyFacet]  # 按难度从低到高
+
+class DifficultyStats(BaseModel):
+    count: int
+    attempt_count: int
+    success_count: int
+    success_rate: float
+    avg_time: Optional[int] = None
+
+class ExerciseStatistics(BaseModel):
+    total: int
+    by_difficulty: Dict[str, int]  # 难度 -> 题目数
+    attempt_count: int
+    success_count: int
+    success_rate: float
+    difficulty_stats: Dict[str, DifficultyStats]
+
+class ExerciseProgressStats(BaseModel):
+    total_attempts: int  # 提交次数
+    completed_exercises: int  # 答对的提交次数
+    attempted_exercises: int  # 提交过的题目数
+    solved_exercises: int  # 答对过的题目数
+    total_score: int
+
+class UserExerciseProgress(ExerciseProgressStats):
+    by_difficulty: Dict[str, ExerciseProgressStats]  # 按难度从低到高
+
 class ExerciseWithStats(Exercise):
     success_rate: float  # 成功率
     difficulty_level: int  # 难度等级（1-5）
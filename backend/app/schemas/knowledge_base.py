@@ -24,6 +24,7 @@ class QuestionBank(QuestionBankBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     question_count: Optional[int] = Field(None, description="题目数量")
+    type_counts: Optional[Dict[str, int]] = Field(None, description="各题型题目数量")
     
     class Config:
         from_attributes = True
@@ -76,7 +77,7 @@ class UserAnswerCreate(UserAnswerBase):
 
 
 class UserAnswer(UserAnswerBase):
-    id: int
+    id: Optional[int] = None  # 启用延迟写入时提交接口返回的记录尚未分配ID
     user_id: int
     is_correct: bool
     score: int
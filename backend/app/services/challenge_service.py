@@ -0,0 +1,271 @@
+import json
+import random
+from datetime import datetime
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.challenge import Challenge, ChallengeSubmission, UserChallengeSummary
+from app.models.exercise import Exercise
+from app.services.completion_times import record_completion_time
+from app.services.write_behind import challenge_submission_log
+
+# 挑战数据格式版本：
+# - None: 旧数据，numbers_data 中保存完整的 1000 个数字（JSON）
+# - 1: 仅保存种子版本与 total_sum，按页用确定性随机源即时生成
+CHALLENGE_DATA_VERSION = 1
+
+TOTAL_PAGES = 100
+PAGE_SIZE = 10
+NUMBER_RANGE = range(1, 201)
+
+
+def generate_page_numbers(user_id: int, exercise_id: int, page_zero_based: int) -> List[int]:
+    """按页生成确定性的挑战数字（每页 10 个 1..200 内互不相同的数字）"""
+    rng = random.Random(f"user:{user_id}|ex:{exercise_id}|page:{page_zero_based}")
+    return rng.sample(NUMBER_RANGE, PAGE_SIZE)
+
+
+def generate_challenge_numbers(user_id: int, exercise_id: int) -> tuple[List[List[int]], int]:
+    """生成用户特定的挑战数字"""
+    numbers: List[List[int]] = []
+    total_sum = 0
+
+    for page in range(TOTAL_PAGES):
+        page_numbers = generate_page_numbers(user_id, exercise_id, page)
+        total_sum += sum(page_numbers)
+        numbers.append(page_numbers)
+
+    return numbers, total_sum
+
+
+def calculate_total_sum(user_id: int, exercise_id: int) -> int:
+    """计算挑战答案（全部页数字之和），不保留中间数字"""
+    return sum(
+        sum(generate_page_numbers(user_id, exercise_id, page))
+        for page in range(TOTAL_PAGES)
+    )
+
+
+def calculate_total_sums(pairs: Iterable[Tuple[int, int]]) -> List[int]:
+    """批量计算 (user_id, exercise_id) 的挑战答案
+
+    复用同一个随机源并按页重新 seed，结果与逐页新建 random.Random 完全一致，
+    省去每页创建随机源对象的开销，供批量预生成使用。
+    """
+    rng = random.Random()
+    totals = []
+    for user_id, exercise_id in pairs:
+        total = 0
+        for page in range(TOTAL_PAGES):
+            rng.seed(f"user:{user_id}|ex:{exercise_id}|page:{page}")
+            total += sum(rng.sample(NUMBER_RANGE, PAGE_SIZE))
+        totals.append(total)
+    return totals
+
+
+def new_challenge(user_id: int, exercise_id: int) -> Challenge:
+    """创建仅保存种子版本的挑战记录（未写入数据库）"""
+    return Challenge(
+        user_id=user_id,
+        exercise_id=exercise_id,
+        numbers_data=None,
+        data_version=CHALLENGE_DATA_VERSION,
+        total_sum=calculate_total_sum(user_id, exercise_id),
+    )
+
+
+def upgrade_challenge(challenge: Challenge) -> bool:
+    """旧格式数据（保存完整数字块）就地转换为仅保存种子版本的新格式
+
+    只修改对象，不读写数据库；返回是否有修改，由调用方（同步或异步会话）负责提交。
+    """
+    if challenge.data_version == CHALLENGE_DATA_VERSION:
+        return False
+
+    challenge.numbers_data = None
+    challenge.data_version = CHALLENGE_DATA_VERSION
+    challenge.total_sum = calculate_total_sum(challenge.user_id, challenge.exercise_id)
+    return True
+
+
+def get_page_numbers(challenge: Challenge, page_number: int) -> List[int]:
+    """获取挑战某一页（从 1 开始）的数字，只生成该页，不解析整块数据"""
+    return generate_page_numbers(challenge.user_id, challenge.exercise_id, page_number - 1)
+
+
+def calculate_score(time_spent: int) -> int:
+    """根据用时计算积分"""
+    base_score = 100  # 基础积分
+    time_bonus = max(0, 300 - time_spent) // 10  # 时间奖励
+    return base_score + time_bonus
+
+
+class SubmissionResult(NamedTuple):
+    newly_completed: bool  # 本次提交是否完成了首次通关
+    score: Optional[int]
+    completed_at: Optional[datetime]
+
+
+class ChallengeService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_submission(self, challenge: Challenge, answer: int, time_spent: int,
+                          is_correct: bool) -> SubmissionResult:
+        """记录一次提交并在同一个短事务内完成状态更新
+
+        通关状态用条件 UPDATE（is_completed = false）切换，计数用原子自增，
+        以受影响行数判断是否为首次通关，避免并发提交重复计数。
+        """
+        # 已加载的状态：通关是单向的，已通关时这些值不会再变化
+        was_completed = challenge.is_completed
+        score = challenge.score
+        completed_at = challenge.completed_at
+
+        newly_completed = False
+        if is_correct and not was_completed:
+            completed_at = datetime.utcnow()
+            score = calculate_score(time_spent)
+            result = self.db.execute(
+                update(Challenge)
+                .where(Challenge.id == challenge.id, Challenge.is_completed == False)
+                .values(
+                    attempts=Challenge.attempts + 1,
+                    is_completed=True,
+                    completed_at=completed_at,
+                    best_time=time_spent,
+                    score=score,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            newly_completed = result.rowcount == 1
+
+        if not newly_completed:
+            self.db.execute(
+                update(Challenge)
+                .where(Challenge.id == challenge.id)
+                .values(attempts=Challenge.attempts + 1)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            # 同步更新题目统计：首次通关才累计成功人数
+            self.db.execute(
+                update(Exercise)
+                .where(Exercise.id == challenge.exercise_id)
+                .values(
+                    success_count=Exercise.success_count + 1,
+                    attempt_count=Exercise.attempt_count + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            record_completion_time(self.db, challenge.exercise_id, time_spent)
+
+        challenge_submission_log.submit(self.db, {
+            "challenge_id": challenge.id,
+            "user_id": challenge.user_id,
+            "exercise_id": challenge.exercise_id,
+            "answer": answer,
+            "time_spent": time_spent,
+            "is_correct": is_correct,
+            "score": score if newly_completed else None,
+        })
+        self.db.flush()
+        self._update_summary(challenge, time_spent, newly_completed, score)
+        self.db.commit()
+
+        if is_correct and not was_completed and not newly_completed:
+            # 并发提交抢先完成了通关，读取其写入的结果
+            self.db.refresh(challenge)
+            score = challenge.score
+            completed_at = challenge.completed_at
+
+        return SubmissionResult(newly_completed, score, completed_at)
+
+    def get_summary(self, user_id: int) -> UserChallengeSummary:
+        """获取用户挑战进度汇总（主键读取），不存在时由历史数据回填"""
+        summary = self.db.get(UserChallengeSummary, user_id)
+        if summary is None:
+            summary = self._build_summary(user_id)
+            self.db.add(summary)
+            try:
+                self.db.commit()
+            except IntegrityError:
+                # 并发请求已回填
+                self.db.rollback()
+                summary = self.db.get(UserChallengeSummary, user_id)
+        return summary
+
+    def _build_summary(self, user_id: int) -> UserChallengeSummary:
+        """从 challenges / challenge_submissions 聚合出汇总行（未写入数据库）"""
+        completed = self.db.query(Challenge.exercise_id, Challenge.score, Challenge.best_time).filter(
+            Challenge.user_id == user_id,
+            Challenge.is_completed == True
+        ).order_by(Challenge.completed_at, Challenge.id).all()
+        total_attempts = self.db.query(func.count(ChallengeSubmission.id)).filter(
+            ChallengeSubmission.user_id == user_id
+        ).scalar()
+        return UserChallengeSummary(
+            user_id=user_id,
+            total_score=sum(row.score or 0 for row in completed),
+            solved_count=len(completed),
+            total_attempts=total_attempts or 0,
+            sum_best_time=sum(row.best_time or 0 for row in completed),
+            completed_exercise_ids=json.dumps([row.exercise_id for row in completed]),
+        )
+
+    def _update_summary(self, challenge: Challenge, time_spent: int, newly_completed: bool,
+                        score: Optional[int]) -> None:
+        """在提交事务内增量更新用户汇总
+
+        首次提交时由历史数据回填，total_attempts 另加上该用户仍在延迟写入队列中的提交
+        （包括本次）。已被后台线程取出、正在写入的那一批无法计入，
+        与回填查询并发的极短窗口内可能少计或多计，属于已知限制。
+        """
+        values = {"total_attempts": UserChallengeSummary.total_attempts + 1}
+        if newly_completed:
+            values.update(
+                total_score=UserChallengeSummary.total_score + (score or 0),
+                solved_count=UserChallengeSummary.solved_count + 1,
+                sum_best_time=UserChallengeSummary.sum_best_time + time_spent,
+            )
+        result = self.db.execute(
+            update(UserChallengeSummary)
+            .where(UserChallengeSummary.user_id == challenge.user_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+        if result.rowcount == 0:
+            # 首次提交：由历史数据（已包含本次提交）回填
+            try:
+                with self.db.begin_nested():
+                    summary = self._build_summary(challenge.user_id)
+                    summary.total_attempts += challenge_submission_log.count_pending(user_id=challenge.user_id)
+                    self.db.add(summary)
+                return
+            except IntegrityError:
+                # 并发提交已插入汇总行，改为增量更新
+                self.db.execute(
+                    update(UserChallengeSummary)
+                    .where(UserChallengeSummary.user_id == challenge.user_id)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+
+        if newly_completed:
+            # 上面的 UPDATE 已持有该行的行锁，这里的读改写不会与其他提交交错
+            row = self.db.query(UserChallengeSummary.completed_exercise_ids).filter(
+                UserChallengeSummary.user_id == challenge.user_id
+            ).with_for_update().one()
+            completed_ids = json.loads(row.completed_exercise_ids or "[]")
+            if challenge.exercise_id not in completed_ids:
+                completed_ids.append(challenge.exercise_id)
+            self.db.execute(
+                update(UserChallengeSummary)
+                .where(UserChallengeSummary.user_id == challenge.user_id)
+                .values(completed_exercise_ids=json.dumps(completed_ids))
+                .execution_options(synchronize_session=False)
+            )
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Deque, List, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.challenge import Challenge
+from app.models.exercise import Exercise
+from app.models.user import User
+
+FEED_SIZE = 50
+
+
+class CompletionFeed:
+    """最近通关记录的进程内环形缓冲区，并向 SSE 订阅者推送新事件"""
+
+    def __init__(self, maxlen: int = FEED_SIZE, queue_size: int = 100):
+        self._lock = threading.Lock()
+        self._buffer: Deque[dict] = deque(maxlen=maxlen)
+        self._subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        self._queue_size = queue_size
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, db: Session) -> None:
+        """用数据库中最近的通关记录初始化缓冲区（启动时执行一次）"""
+        rows = (
+            db.query(
+                Challenge.id.label("challenge_id"),
+                Challenge.completed_at,
+                Challenge.score,
+                User.id.label("user_id"),
+                User.username,
+                User.full_name,
+                User.avatar_url,
+                Exercise.id.label("exercise_id"),
+                Exercise.title.label("exercise_title"),
+            )
+            .join(User, User.id == Challenge.user_id)
+            .join(Exercise, Exercise.id == Challenge.exercise_id)
+            .filter(Challenge.is_completed == True)
+            .order_by(Challenge.completed_at.desc())
+            .limit(self._buffer.maxlen)
+            .all()
+        )
+        events = [
+            {
+                "challenge_id": r.challenge_id,
+                "completed_at": r.completed_at.isoformat() if r.completed_at else None,
+                "score": r.score or 0,
+                "user_id": r.user_id,
+                "username": r.username,
+                "full_name": r.full_name,
+                "avatar_url": r.avatar_url,
+                "exercise_id": r.exercise_id,
+                "exercise_title": r.exercise_title,
+            }
+            for r in reversed(rows)
+        ]
+        with self._lock:
+            if self._loaded:
+                return
+            # 加载期间已发布的事件排在历史记录之后
+            pending = list(self._buffer)
+            self._buffer.clear()
+            self._buffer.extend(events)
+            self._buffer.extend(pending)
+            self._loaded = True
+
+    def publish(self, event: dict) -> None:
+        with self._lock:
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._offer, queue, event)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: dict) -> None:
+        # 订阅者消费过慢时丢弃事件，不阻塞发布方
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    def recent(self, limit: int) -> List[dict]:
+        """按通关时间倒序返回最近 limit 条"""
+        with self._lock:
+            return list(self._buffer)[::-1][:limit]
+
+    def subscribe(self) -> Tuple[asyncio.Queue, List[dict]]:
+        """订阅新事件，同时返回当前缓冲区内容（按时间正序）用于回放"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+            return queue, list(self._buffer)
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers = {item for item in self._subscribers if item[1] is not queue}
+
+
+completion_feed = CompletionFeed()
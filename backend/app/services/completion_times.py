@@ -0,0 +1,151 @@
+import json
+import math
+from typing import Dict, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.exercise import Exercise
+
+# 分位数的相对误差上限（1%）
+RELATIVE_ACCURACY = 0.01
+
+SKETCH_VERSION = 1
+
+PERCENTILES = {"p50_time": 0.50, "p90_time": 0.90, "p99_time": 0.99}
+
+
+class DDSketch:
+    """完成用时的分位数草图（DDSketch）
+
+    按对数等比分桶计数，任意分位数的相对误差不超过 RELATIVE_ACCURACY；
+    只需保存桶计数，可增量更新，也可直接合并（桶计数相加）。
+    用时以秒为单位，范围有限，桶数通常只有几十到几百个。
+    """
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        # 桶 (gamma^(k-1), gamma^k] 的代表值，与桶内任意值的相对误差不超过 relative_accuracy
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= 0:
+            self.zero_count += count
+            value = 0
+        else:
+            key = self._key(value)
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "DDSketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("只能合并相对误差相同的草图")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """第 q 分位数（0 <= q <= 1），没有数据时返回 None"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return min(max(self._value(key), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def to_json(self) -> str:
+        """序列化为紧凑的 JSON：桶下标按差值编码，与计数分别存为数组"""
+        data = {
+            "v": SKETCH_VERSION,
+            "a": self.relative_accuracy,
+            "n": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "zero": self.zero_count,
+        }
+        keys = sorted(self.bins)
+        data["keys"] = [key - previous for key, previous in zip(keys, [0] + keys)]
+        data["counts"] = [self.bins[key] for key in keys]
+        return json.dumps(data, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, value: Optional[str]) -> "DDSketch":
+        """反序列化，空值或无法识别的数据返回空草图"""
+        if not value:
+            return cls()
+        try:
+            data = json.loads(value)
+        except json.JSONDecodeError:
+            return cls()
+        if data.get("v") != SKETCH_VERSION:
+            return cls()
+
+        sketch = cls(relative_accuracy=data["a"])
+        sketch.count = data["n"]
+        sketch.sum = data["sum"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        sketch.zero_count = data["zero"]
+        key = 0
+        for delta, count in zip(data["keys"], data["counts"]):
+            key += delta
+            sketch.bins[key] = count
+        return sketch
+
+    def summary(self) -> dict:
+        """exercises 表中的反规范化统计：平均用时与 p50/p90/p99（秒，取整）"""
+        values = {"avg_time": self.mean}
+        values.update({column: self.quantile(q) for column, q in PERCENTILES.items()})
+        return {column: round(value) if value is not None else None for column, value in values.items()}
+
+
+def record_completion_time(db: Session, exercise_id: int, time_spent: int) -> None:
+    """在调用方事务内把一次完成用时加入题目草图，并更新平均用时与分位数
+
+    读取时锁定题目行（SELECT ... FOR UPDATE），并发提交依次合并，不会丢失计数。
+    """
+    row = db.execute(
+        select(Exercise.time_sketch).where(Exercise.id == exercise_id).with_for_update()
+    ).first()
+    if row is None:
+        return
+
+    sketch = DDSketch.from_json(row.time_sketch)
+    sketch.add(time_spent)
+    db.execute(
+        update(Exercise)
+        .where(Exercise.id == exercise_id)
+        .values(time_sketch=sketch.to_json(), **sketch.summary())
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,409 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from itertools import islice
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.exercise import Exercise, ExerciseTag
+from app.schemas.exercise import Exercise as ExerciseSchema
+
+
+class ExerciseIdIndex:
+    """进程内题目解析索引：id -> is_active，sort_order -> id（仅启用的题目）
+
+    题目数量很少且几乎不变，加载一次后所有解析都在内存中完成；
+    题目增删改时调用 invalidate()，其他 worker 依靠 TTL 兜底刷新。
+    """
+
+    def __init__(self, ttl: int = settings.EXERCISE_CACHE_TTL):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._loaded_at = 0.0
+        self._active_by_id: Optional[Dict[int, bool]] = None
+        self._id_by_sort_order: Dict[int, int] = {}
+
+    def load(self, db: Session) -> None:
+        """从数据库加载索引"""
+        with self._lock:
+            generation = self._generation
+
+        rows = db.execute(self._load_statement()).all()
+        self._apply(rows, generation)
+
+    async def load_async(self, db: AsyncSession) -> None:
+        """load() 的异步版本"""
+        with self._lock:
+            generation = self._generation
+
+        rows = (await db.execute(self._load_statement())).all()
+        self._apply(rows, generation)
+
+    @staticmethod
+    def _load_statement():
+        return select(Exercise.id, Exercise.sort_order, Exercise.is_active).order_by(Exercise.id)
+
+    def _apply(self, rows, generation: int) -> None:
+        active_by_id = {row.id: bool(row.is_active) for row in rows}
+        id_by_sort_order: Dict[int, int] = {}
+        for row in rows:
+            if row.is_active:
+                # 与原查询一致：同一 sort_order 取 id 最小的启用题目
+                id_by_sort_order.setdefault(row.sort_order, row.id)
+
+        with self._lock:
+            # 加载期间发生过失效，则丢弃这次结果，下次重新加载
+            if generation != self._generation:
+                return
+            self._active_by_id = active_by_id
+            self._id_by_sort_order = id_by_sort_order
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._active_by_id = None
+            self._id_by_sort_order = {}
+
+    def _is_fresh(self) -> bool:
+        return self._active_by_id is not None and time.monotonic() - self._loaded_at < self._ttl
+
+    def resolve(self, exercise_id_or_sort_order: int, db: Session) -> Optional[int]:
+        """先按 ID、再按启用题目的 sort_order 解析，找不到返回 None"""
+        if not self._is_fresh():
+            self.load(db)
+
+        found, exercise_id = self._lookup(exercise_id_or_sort_order)
+        if found:
+            return exercise_id
+
+        # 加载与失效并发，直接查询一次
+        exercise_id = db.execute(self._by_id_statement(exercise_id_or_sort_order)).scalar()
+        if exercise_id is not None:
+            return exercise_id
+        return db.execute(self._by_sort_order_statement(exercise_id_or_sort_order)).scalar()
+
+    async def resolve_async(self, exercise_id_or_sort_order: int, db: AsyncSession) -> Optional[int]:
+        """resolve() 的异步版本"""
+        if not self._is_fresh():
+            await self.load_async(db)
+
+        found, exercise_id = self._lookup(exercise_id_or_sort_order)
+        if found:
+            return exercise_id
+
+        exercise_id = (await db.execute(self._by_id_statement(exercise_id_or_sort_order))).scalar()
+        if exercise_id is not None:
+            return exercise_id
+        return (await db.execute(self._by_sort_order_statement(exercise_id_or_sort_order))).scalar()
+
+    def _lookup(self, exercise_id_or_sort_order: int) -> Tuple[bool, Optional[int]]:
+        """在内存索引中解析，返回 (索引是否可用, 解析结果)"""
+        with self._lock:
+            active_by_id = self._active_by_id
+            id_by_sort_order = self._id_by_sort_order
+
+        if active_by_id is None:
+            return False, None
+        if exercise_id_or_sort_order in active_by_id:
+            return True, exercise_id_or_sort_order
+        return True, id_by_sort_order.get(exercise_id_or_sort_order)
+
+    @staticmethod
+    def _by_id_statement(exercise_id: int):
+        return select(Exercise.id).where(Exercise.id == exercise_id)
+
+    @staticmethod
+    def _by_sort_order_statement(sort_order: int):
+        return select(Exercise.id).where(
+            Exercise.sort_order == sort_order,
+            Exercise.is_active == True
+        ).order_by(Exercise.id).limit(1)
+
+
+DIFFICULTIES = ["初级", "中级", "高级", "困难", "地狱"]
+DIFFICULTY_RANK = {difficulty: rank for rank, difficulty in enumerate(DIFFICULTIES)}
+
+
+def difficulty_rank(difficulty: str) -> int:
+    """难度从低到高的序号，未知难度排在最后"""
+    return DIFFICULTY_RANK.get(difficulty, len(DIFFICULTIES))
+
+
+TAG_MAX_LENGTH = 50
+
+
+def normalize_tags(tags: Optional[Iterable[str]]) -> List[str]:
+    """去除空白与重复标签（保持原顺序），超长标签截断"""
+    result: List[str] = []
+    for tag in tags or ():
+        tag = (tag or "").strip()[:TAG_MAX_LENGTH]
+        if tag and tag not in result:
+            result.append(tag)
+    return result
+
+
+def parse_tag_filter(value: Optional[str]) -> List[str]:
+    """解析查询参数中逗号分隔的标签列表"""
+    return normalize_tags(value.split(",")) if value else []
+
+
+# 列表排序方式 -> 排序键（id 作为稳定的次序；难度按预先定义的等级而不是字符串排序）
+SORT_KEYS = {
+    "sort_order": lambda e: (e.sort_order, e.id),
+    "difficulty": lambda e: (difficulty_rank(e.difficulty), e.id),
+    "points": lambda e: (-e.points, e.id),
+    "popular": lambda e: (-e.view_count, e.id),
+    "solved": lambda e: (-e.success_count, e.id),
+}
+
+
+class CatalogSnapshot(NamedTuple):
+    version: int
+    loaded_at: float
+    # 启用的题目（按 id 排列）与各排序方式下的下标顺序
+    exercises: Tuple[ExerciseSchema, ...]
+    orderings: Dict[str, Tuple[int, ...]]
+    # 搜索用的小写标题与描述
+    search_text: Tuple[Tuple[str, str], ...]
+    # 各题目的标签集合，以及标签 -> 题目下标（来自 exercise_tags 表）
+    tag_sets: Tuple[FrozenSet[str], ...]
+    tag_postings: Dict[str, FrozenSet[int]]
+
+
+class ExerciseCatalog:
+    """启用题目的进程内只读快照，列表与计数的筛选、排序、分页都在内存中完成
+
+    快照带版本号：题目增删改时调用 invalidate() 使版本失效，下次访问重新加载；
+    访问次数、通关人数等统计随 TTL 刷新（其他 worker 的变更同样依靠 TTL）。
+    """
+
+    def __init__(self, ttl: int = settings.EXERCISE_CACHE_TTL):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._version = 0
+        self._snapshot: Optional[CatalogSnapshot] = None
+
+    def load(self, db: Session) -> CatalogSnapshot:
+        with self._lock:
+            version = self._version
+
+        rows = db.query(Exercise).filter(Exercise.is_active == True).order_by(Exercise.id).all()
+        exercises = tuple(ExerciseSchema.model_validate(row) for row in rows)
+        tag_sets = self._load_tag_sets(db, exercises)
+        tag_postings: Dict[str, set] = defaultdict(set)
+        for i, tags in enumerate(tag_sets):
+            for tag in tags:
+                tag_postings[tag].add(i)
+        snapshot = CatalogSnapshot(
+            version=version,
+            loaded_at=time.monotonic(),
+            exercises=exercises,
+            orderings={
+                sort_by: tuple(sorted(range(len(exercises)), key=lambda i, k=key: k(exercises[i])))
+                for sort_by, key in SORT_KEYS.items()
+            },
+            search_text=tuple((e.title.lower(), e.description.lower()) for e in exercises),
+            tag_sets=tag_sets,
+            tag_postings={tag: frozenset(indexes) for tag, indexes in tag_postings.items()},
+        )
+
+        with self._lock:
+            # 加载期间发生过失效，则本次结果只用于当前请求，不缓存
+            if version == self._version:
+                self._snapshot = snapshot
+        return snapshot
+
+    @staticmethod
+    def _load_tag_sets(db: Session, exercises: Tuple[ExerciseSchema, ...]) -> Tuple[FrozenSet[str], ...]:
+        rows = db.execute(
+            select(ExerciseTag.exercise_id, ExerciseTag.tag)
+            .join(Exercise, Exercise.id == ExerciseTag.exercise_id)
+            .where(Exercise.is_active == True)
+        ).all()
+        tags_by_id: Dict[int, set] = defaultdict(set)
+        for row in rows:
+            tags_by_id[row.exercise_id].add(row.tag)
+        # 尚未回填 exercise_tags 的题目退回使用 JSON 中的标签
+        return tuple(
+            frozenset(tags_by_id.get(e.id) or normalize_tags(e.tags)) for e in exercises
+        )
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+
+    def snapshot(self, db: Session) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.loaded_at >= self._ttl:
+            snapshot = self.load(db)
+        return snapshot
+
+    @staticmethod
+    def _tag_candidates(snapshot: CatalogSnapshot, tags: Optional[List[str]]) -> Optional[FrozenSet[int]]:
+        """同时带有全部筛选标签的题目下标，不按标签筛选时返回 None"""
+        if not tags:
+            return None
+        postings = [snapshot.tag_postings.get(tag, frozenset()) for tag in tags]
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def _matching(self, snapshot: CatalogSnapshot, sort_by: str, difficulty: Optional[str],
+                  search: Optional[str], tags: Optional[List[str]] = None):
+        ordering = snapshot.orderings.get(sort_by, snapshot.orderings["sort_order"])
+        needle = search.lower() if search else None
+        candidates = self._tag_candidates(snapshot, tags)
+        if candidates is not None and not candidates:
+            return
+        for i in ordering:
+            if candidates is not None and i not in candidates:
+                continue
+            exercise = snapshot.exercises[i]
+            if difficulty and exercise.difficulty != difficulty:
+                continue
+            if needle:
+                title, description = snapshot.search_text[i]
+                if needle not in title and needle not in description:
+                    continue
+            yield i
+
+    def list(self, db: Session, skip: int = 0, limit: int = 100, difficulty: Optional[str] = None,
+             search: Optional[str] = None, sort_by: str = "sort_order",
+             tags: Optional[List[str]] = None) -> List[ExerciseSchema]:
+        snapshot = self.snapshot(db)
+        if not difficulty and not search and not tags:
+            ordering = snapshot.orderings.get(sort_by, snapshot.orderings["sort_order"])
+            return [snapshot.exercises[i] for i in ordering[skip:skip + limit]]
+        matches = self._matching(snapshot, sort_by, difficulty, search, tags)
+        return [snapshot.exercises[i] for i in islice(matches, skip, skip + limit)]
+
+    def count(self, db: Session, difficulty: Optional[str] = None, search: Optional[str] = None,
+              tags: Optional[List[str]] = None) -> int:
+        snapshot = self.snapshot(db)
+        if not difficulty and not search and not tags:
+            return len(snapshot.exercises)
+        return sum(1 for _ in self._matching(snapshot, "sort_order", difficulty, search, tags))
+
+    def facets(self, db: Session, difficulty: Optional[str] = None, search: Optional[str] = None,
+               tags: Optional[List[str]] = None) -> dict:
+        """当前筛选条件下的题目总数、各标签与各难度的题目数（一次遍历计算）"""
+        snapshot = self.snapshot(db)
+        tag_counts: Counter = Counter()
+        difficulty_counts: Counter = Counter()
+        total = 0
+        for i in self._matching(snapshot, "sort_order", difficulty, search, tags):
+            total += 1
+            tag_counts.update(snapshot.tag_sets[i])
+            difficulty_counts[snapshot.exercises[i].difficulty] += 1
+
+        return {
+            "total": total,
+            "tags": [
+                {"tag": tag, "count": count}
+                for tag, count in sorted(tag_counts.items(), key=lambda item: (-item[1], item[0]))
+            ],
+            "difficulties": [
+                {"difficulty": d, "count": difficulty_counts[d]}
+                for d in sorted(difficulty_counts, key=lambda d: (difficulty_rank(d), d))
+            ],
+        }
+
+
+def _success_rate(success_count: int, attempt_count: int) -> float:
+    return round(success_count / attempt_count, 4) if attempt_count else 0.0
+
+
+class ExerciseStatistics:
+    """题目统计（按难度汇总），一次 GROUP BY 查询计算，题目变更时失效，计数随 TTL 刷新"""
+
+    def __init__(self, ttl: int = settings.EXERCISE_STATS_TTL):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._version = 0
+        self._cached: Optional[Tuple[int, float, dict]] = None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._cached = None
+
+    def get(self, db: Session) -> dict:
+        cached = self._cached
+        if cached is not None and time.monotonic() - cached[1] < self._ttl:
+            return cached[2]
+
+        with self._lock:
+            version = self._version
+        stats = self._compute(db)
+        with self._lock:
+            if version == self._version:
+                self._cached = (version, time.monotonic(), stats)
+        return stats
+
+    @staticmethod
+    def _compute(db: Session) -> dict:
+        rows = db.execute(
+            select(
+                Exercise.difficulty,
+                func.count(Exercise.id).label("count"),
+                func.coalesce(func.sum(Exercise.attempt_count), 0).label("attempt_count"),
+                func.coalesce(func.sum(Exercise.success_count), 0).label("success_count"),
+                # 按通关次数加权的平均用时（各题平均值直接平均会让冷门题与热门题权重相同）
+                (
+                    func.sum(Exercise.avg_time * Exercise.success_count)
+                    / func.nullif(
+                        func.sum(case((Exercise.avg_time.isnot(None), Exercise.success_count), else_=0)), 0
+                    )
+                ).label("avg_time"),
+            )
+            .where(Exercise.is_active == True)
+            .group_by(Exercise.difficulty)
+        ).all()
+
+        by_difficulty = {difficulty: 0 for difficulty in DIFFICULTIES}
+        difficulty_stats = {}
+        for row in rows:
+            attempt_count = int(row.attempt_count)
+            success_count = int(row.success_count)
+            by_difficulty[row.difficulty] = row.count
+            difficulty_stats[row.difficulty] = {
+                "count": row.count,
+                "attempt_count": attempt_count,
+                "success_count": success_count,
+                "success_rate": _success_rate(success_count, attempt_count),
+                "avg_time": int(row.avg_time) if row.avg_time is not None else None,
+            }
+
+        # 按难度从低到高排列
+        difficulty_stats = {
+            difficulty: difficulty_stats[difficulty]
+            for difficulty in sorted(difficulty_stats, key=lambda d: (difficulty_rank(d), d))
+        }
+        attempt_count = sum(item["attempt_count"] for item in difficulty_stats.values())
+        success_count = sum(item["success_count"] for item in difficulty_stats.values())
+        return {
+            "total": sum(by_difficulty.values()),
+            "by_difficulty": by_difficulty,
+            "attempt_count": attempt_count,
+            "success_count": success_count,
+            "success_rate": _success_rate(success_count, attempt_count),
+            "difficulty_stats": difficulty_stats,
+        }
+
+
+exercise_index = ExerciseIdIndex()
+exercise_catalog = ExerciseCatalog()
+exercise_statistics = ExerciseStatistics()
+
+
+def invalidate_catalog() -> None:
+    """题目数据变更后调用，使进程内缓存失效"""
+    exercise_index.invalidate()
+    exercise_catalog.invalidate()
+    exercise_statistics.invalidate()
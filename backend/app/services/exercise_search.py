@@ -0,0 +1,168 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.schemas.exercise import Exercise as ExerciseSchema
+from app.services.exercise_catalog import CatalogSnapshot, exercise_catalog
+
+# 字段权重：标题命中最重要，其次是标签与挑战要点
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "tags": 2.0,
+    "challenge_points": 1.5,
+    "description": 1.0,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 连续的中日韩字符切分为单字与二字组（单字用于一个字的检索词），英文与数字按单词切分
+_TOKEN_PATTERN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[a-z0-9]+")
+_CJK_PATTERN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+
+
+def tokenize(text: str) -> List[str]:
+    """分词：中文输出单字与相邻二字组，英文/数字输出小写单词"""
+    tokens: List[str] = []
+    for run in _TOKEN_PATTERN.findall((text or "").lower()):
+        if not _CJK_PATTERN.match(run):
+            tokens.append(run)
+            continue
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _document_fields(exercise: ExerciseSchema) -> Dict[str, str]:
+    return {
+        "title": exercise.title,
+        "tags": " ".join(exercise.tags or []),
+        "challenge_points": exercise.challenge_points,
+        "description": exercise.description,
+    }
+
+
+class SearchHit(NamedTuple):
+    exercise: ExerciseSchema
+    score: float
+
+
+class ExerciseSearchIndex:
+    """题目全文检索：按字段维护倒排索引，BM25 打分
+
+    索引跟随题目快照同步：快照因题目增删改或 TTL 重新加载后，下次检索只重建内容变化的题目。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._source: Optional[CatalogSnapshot] = None
+        self._exercises: Dict[int, ExerciseSchema] = {}
+        self._fingerprints: Dict[int, Tuple[str, ...]] = {}
+        # 字段 -> 词 -> {题目ID: 词频}
+        self._postings: Dict[str, Dict[str, Dict[int, int]]] = {
+            field: defaultdict(dict) for field in FIELD_WEIGHTS
+        }
+        # 字段 -> {题目ID: 字段长度}
+        self._lengths: Dict[str, Dict[int, int]] = {field: {} for field in FIELD_WEIGHTS}
+        self._total_lengths: Dict[str, int] = {field: 0 for field in FIELD_WEIGHTS}
+        # 词 -> 包含该词的题目数（任一字段）
+        self._document_frequency: Counter = Counter()
+        self._document_terms: Dict[int, set] = {}
+
+    def _remove(self, exercise_id: int) -> None:
+        if exercise_id not in self._exercises:
+            return
+        for field in FIELD_WEIGHTS:
+            self._total_lengths[field] -= self._lengths[field].pop(exercise_id, 0)
+        for term in self._document_terms.pop(exercise_id, ()):
+            for field in FIELD_WEIGHTS:
+                postings = self._postings[field].get(term)
+                if postings and exercise_id in postings:
+                    del postings[exercise_id]
+                    if not postings:
+                        del self._postings[field][term]
+            self._document_frequency[term] -= 1
+            if self._document_frequency[term] <= 0:
+                del self._document_frequency[term]
+        del self._exercises[exercise_id]
+        self._fingerprints.pop(exercise_id, None)
+
+    def _add(self, exercise: ExerciseSchema, fields: Dict[str, str]) -> None:
+        terms = set()
+        for field, text in fields.items():
+            counts = Counter(tokenize(text))
+            for term, tf in counts.items():
+                self._postings[field][term][exercise.id] = tf
+            length = sum(counts.values())
+            self._lengths[field][exercise.id] = length
+            self._total_lengths[field] += length
+            terms.update(counts)
+        for term in terms:
+            self._document_frequency[term] += 1
+        self._document_terms[exercise.id] = terms
+        self._exercises[exercise.id] = exercise
+        self._fingerprints[exercise.id] = tuple(fields.values())
+
+    def sync(self, snapshot: CatalogSnapshot) -> None:
+        """与题目快照同步，只重建新增、删除或内容变化的题目"""
+        with self._lock:
+            if snapshot is self._source:
+                return
+            current = {exercise.id: exercise for exercise in snapshot.exercises}
+            for exercise_id in list(self._exercises):
+                if exercise_id not in current:
+                    self._remove(exercise_id)
+            for exercise_id, exercise in current.items():
+                fields = _document_fields(exercise)
+                if self._fingerprints.get(exercise_id) == tuple(fields.values()):
+                    # 内容未变，只更新返回的题目数据（统计数字等）
+                    self._exercises[exercise_id] = exercise
+                    continue
+                self._remove(exercise_id)
+                self._add(exercise, fields)
+            self._source = snapshot
+
+    def _score(self, terms: List[str]) -> Dict[int, float]:
+        total_docs = len(self._exercises)
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(terms):
+            df = self._document_frequency.get(term)
+            if not df:
+                continue
+            idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+            for field, weight in FIELD_WEIGHTS.items():
+                postings = self._postings[field].get(term)
+                if not postings:
+                    continue
+                avg_length = self._total_lengths[field] / total_docs or 1
+                lengths = self._lengths[field]
+                for exercise_id, tf in postings.items():
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths[exercise_id] / avg_length)
+                    scores[exercise_id] += weight * idf * tf * (BM25_K1 + 1) / norm
+        return scores
+
+    def search(self, db: Session, query: str, skip: int = 0, limit: int = 20,
+               difficulty: Optional[str] = None) -> Tuple[int, List[SearchHit]]:
+        """检索题目，返回 (命中总数, 当前页结果)，按相关度降序"""
+        self.sync(exercise_catalog.snapshot(db))
+        terms = tokenize(query)
+        if not terms:
+            return 0, []
+
+        with self._lock:
+            scores = self._score(terms)
+            exercises = self._exercises
+            hits = [
+                SearchHit(exercises[exercise_id], round(score, 4))
+                for exercise_id, score in scores.items()
+                if not difficulty or exercises[exercise_id].difficulty == difficulty
+            ]
+        hits.sort(key=lambda hit: (-hit.score, hit.exercise.sort_order, hit.exercise.id))
+        return len(hits), hits[skip:skip + limit]
+
+
+exercise_search_index = ExerciseSearchIndex()
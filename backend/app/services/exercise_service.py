@@ -1,68 +1,44 @@
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc
 from typing import List, Optional
 import json
-from app.models.exercise import Exercise, ExerciseSubmission
-from app.schemas.exercise import ExerciseCreate, ExerciseUpdate
+from app.models.exercise import Exercise, ExerciseSubmission, ExerciseTag
+from app.schemas.exercise import Exercise as ExerciseSchema, ExerciseCreate, ExerciseUpdate
+from app.services.exercise_catalog import (
+    DIFFICULTIES, difficulty_rank, exercise_catalog, exercise_statistics, invalidate_catalog,
+    normalize_tags,
+)
+from app.services.completion_times import record_completion_time
+from app.services.view_counter import exercise_views
 
 class ExerciseService:
     def __init__(self, db: Session):
         self.db = db
 
     def get_all(self, skip: int = 0, limit: int = 100, difficulty: Optional[str] = None, 
-                search: Optional[str] = None, sort_by: str = "sort_order") -> List[Exercise]:
-        """获取所有题目"""
-        query = self.db.query(Exercise).filter(Exercise.is_active == True)
-        
-        # 难度筛选
-        if difficulty:
-            query = query.filter(Exercise.difficulty == difficulty)
-        
-        # 搜索
-        if search:
-            query = query.filter(
-                Exercise.title.contains(search) | 
-                Exercise.description.contains(search)
-            )
-        
-        # 排序
-        if sort_by == "difficulty":
-            difficulty_order = {"初级": 1, "中级": 2, "高级": 3, "困难": 4, "地狱": 5}
-            query = query.order_by(Exercise.difficulty)
-        elif sort_by == "points":
-            query = query.order_by(desc(Exercise.points))
-        elif sort_by == "popular":
-            query = query.order_by(desc(Exercise.view_count))
-        elif sort_by == "solved":
-            # 按解决人数排序
-            query = query.order_by(desc(Exercise.success_count), asc(Exercise.id))
-        else:
-            query = query.order_by(asc(Exercise.sort_order), asc(Exercise.id))
-        
-        return query.offset(skip).limit(limit).all()
+                search: Optional[str] = None, sort_by: str = "sort_order",
+                tags: Optional[List[str]] = None) -> List[ExerciseSchema]:
+        """获取所有题目（由进程内题目快照提供，不查询数据库）"""
+        return exercise_catalog.list(
+            self.db, skip=skip, limit=limit, difficulty=difficulty, search=search, sort_by=sort_by, tags=tags
+        )
 
-    def get_count(self, difficulty: Optional[str] = None, search: Optional[str] = None) -> int:
+    def get_count(self, difficulty: Optional[str] = None, search: Optional[str] = None,
+                  tags: Optional[List[str]] = None) -> int:
         """获取符合筛选条件的题目总数"""
-        query = self.db.query(Exercise).filter(Exercise.is_active == True)
+        return exercise_catalog.count(self.db, difficulty=difficulty, search=search, tags=tags)
 
-        if difficulty:
-            query = query.filter(Exercise.difficulty == difficulty)
-
-        if search:
-            query = query.filter(
-                Exercise.title.contains(search) |
-                Exercise.description.contains(search)
-            )
-
-        return query.count()
+    def get_facets(self, difficulty: Optional[str] = None, search: Optional[str] = None,
+                   tags: Optional[List[str]] = None) -> dict:
+        """获取符合筛选条件的题目按标签、按难度的分面计数"""
+        return exercise_catalog.facets(self.db, difficulty=difficulty, search=search, tags=tags)
 
     def get_by_id(self, exercise_id: int) -> Optional[Exercise]:
         """根据ID获取题目"""
         exercise = self.db.query(Exercise).filter(Exercise.id == exercise_id).first()
         if exercise:
-            # 增加访问次数
-            exercise.view_count += 1
-            self.db.commit()
+            # 增加访问次数（缓冲后批量写入）
+            exercise_views.hit(self.db, exercise)
         return exercise
 
     def get_by_sort_order(self, sort_order: int) -> Optional[Exercise]:
@@ -72,9 +48,8 @@ class ExerciseService:
             Exercise.is_active == True
         ).first()
         if exercise:
-            # 增加访问次数
-            exercise.view_count += 1
-            self.db.commit()
+            # 增加访问次数（缓冲后批量写入）
+            exercise_views.hit(self.db, exercise)
         return exercise
 
     def create(self, exercise_data: ExerciseCreate) -> Exercise:
@@ -84,13 +59,14 @@ class ExerciseService:
             description=exercise_data.description,
             difficulty=exercise_data.difficulty,
             challenge_points=exercise_data.challenge_points,
-            tags=json.dumps(exercise_data.tags, ensure_ascii=False),
             points=exercise_data.points,
             is_active=exercise_data.is_active,
             sort_order=exercise_data.sort_order
         )
+        self._set_tags(exercise, exercise_data.tags)
         self.db.add(exercise)
         self.db.commit()
+        invalidate_catalog()
         self.db.refresh(exercise)
         return exercise
 
@@ -102,15 +78,24 @@ class ExerciseService:
         
         update_data = exercise_data.dict(exclude_unset=True)
         if "tags" in update_data:
-            update_data["tags"] = json.dumps(update_data["tags"], ensure_ascii=False)
+            self._set_tags(exercise, update_data.pop("tags"))
         
         for field, value in update_data.items():
             setattr(exercise, field, value)
         
         self.db.commit()
+        invalidate_catalog()
         self.db.refresh(exercise)
         return exercise
 
+    @staticmethod
+    def _set_tags(exercise: Exercise, tags: Optional[List[str]]) -> None:
+        """同时写入 JSON 标签与 exercise_tags 表，已有的标签行保留，只增删变化的部分"""
+        tags = normalize_tags(tags)
+        exercise.tags = json.dumps(tags, ensure_ascii=False)
+        existing = {link.tag: link for link in exercise.tag_links}
+        exercise.tag_links = [existing.get(tag) or ExerciseTag(tag=tag) for tag in tags]
+
     def delete(self, exercise_id: int) -> bool:
         """删除题目（软删除）"""
         exercise = self.db.query(Exercise).filter(Exercise.id == exercise_id).first()
@@ -119,24 +104,12 @@ class ExerciseService:
         
         exercise.is_active = False
         self.db.commit()
+        invalidate_catalog()
         return True
 
     def get_statistics(self) -> dict:
-        """获取题目统计信息"""
-        total = self.db.query(Exercise).filter(Exercise.is_active == True).count()
-        by_difficulty = {}
-        
-        for difficulty in ["初级", "中级", "高级", "困难", "地狱"]:
-            count = self.db.query(Exercise).filter(
-                Exercise.is_active == True,
-                Exercise.difficulty == difficulty
-            ).count()
-            by_difficulty[difficulty] = count
-        
-        return {
-            "total": total,
-            "by_difficulty": by_difficulty
-        }
+        """获取题目统计信息（按难度汇总的数量、尝试次数与通过率，带缓存）"""
+        return exercise_statistics.get(self.db)
 
     def submit_answer(self, exercise_id: int, user_id: int, answer: str, 
                      time_spent: Optional[int] = None) -> ExerciseSubmission:
@@ -154,11 +127,8 @@ class ExerciseService:
         if is_correct:
             exercise.success_count += 1
             if time_spent:
-                # 更新平均时间
-                if exercise.avg_time:
-                    exercise.avg_time = (exercise.avg_time + time_spent) // 2
-                else:
-                    exercise.avg_time = time_spent
+                # 更新完成用时草图（平均用时与分位数）
+                record_completion_time(self.db, exercise.id, time_spent)
         
         submission = ExerciseSubmission(
             exercise_id=exercise_id,
@@ -181,16 +151,52 @@ class ExerciseService:
         return True
 
     def get_user_progress(self, user_id: int) -> dict:
-        """获取用户进度"""
-        submissions = self.db.query(ExerciseSubmission).filter(
-            ExerciseSubmission.user_id == user_id
+        """获取用户进度（总体与按难度）
+
+        在 (user_id, exercise_id, is_correct, score) 覆盖索引上范围扫描该用户的提交并按题目分组聚合，
+        扫描量与该用户的提交数成正比，但不回表、不把提交记录加载到内存；
+        分组结果行数不超过题目数，再关联 exercises 取难度。
+        completed_exercises 沿用原含义（答对的提交次数），solved_exercises 为答对过的题目数。
+        """
+        per_exercise = (
+            select(
+                ExerciseSubmission.exercise_id,
+                func.count().label("attempts"),
+                func.coalesce(func.sum(case((ExerciseSubmission.is_correct == True, 1), else_=0)), 0)
+                .label("correct"),
+                func.coalesce(func.sum(ExerciseSubmission.score), 0).label("score"),
+            )
+            .where(ExerciseSubmission.user_id == user_id)
+            .group_by(ExerciseSubmission.exercise_id)
+            .subquery()
+        )
+        rows = self.db.execute(
+            select(Exercise.difficulty, per_exercise)
+            .join(Exercise, Exercise.id == per_exercise.c.exercise_id)
         ).all()
-        
-        completed = len([s for s in submissions if s.is_correct])
-        total_score = sum(s.score or 0 for s in submissions)
-        
-        return {
-            "total_attempts": len(submissions),
-            "completed_exercises": completed,
-            "total_score": total_score
-        }
\ No newline at end of file
+
+        def empty() -> dict:
+            return {
+                "total_attempts": 0,
+                "completed_exercises": 0,
+                "attempted_exercises": 0,
+                "solved_exercises": 0,
+                "total_score": 0,
+            }
+
+        progress = empty()
+        by_difficulty = {difficulty: empty() for difficulty in DIFFICULTIES}
+        for row in rows:
+            bucket = by_difficulty.setdefault(row.difficulty, empty())
+            for item in (progress, bucket):
+                item["total_attempts"] += row.attempts
+                item["completed_exercises"] += int(row.correct)
+                item["attempted_exercises"] += 1
+                item["solved_exercises"] += 1 if row.correct else 0
+                item["total_score"] += int(row.score)
+
+        progress["by_difficulty"] = {
+            difficulty: by_difficulty[difficulty]
+            for difficulty in sorted(by_difficulty, key=lambda d: (difficulty_rank(d), d))
+        }
+        return progress
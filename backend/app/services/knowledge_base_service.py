@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, case
 from typing import List, Optional, Dict, Any
 import uuid
 import random
@@ -14,6 +14,11 @@ from app.schemas.knowledge_base import (
     UserAnswerCreate, WrongQuestionCreate, ExamSessionCreate,
     ExamSetupRequest, PracticeSetupRequest
 )
+from app.services.write_behind import user_answer_log
+
+
+# 题型（与 Question.type 的取值一致）
+QUESTION_TYPES = ["单选题", "多选题", "判断题", "填空题", "问答题"]
 
 
 class QuestionBankService:
@@ -36,18 +41,29 @@ class QuestionBankService:
         ).first()
     
     def get_banks(self, skip: int = 0, limit: int = 100) -> List[QuestionBank]:
-        """获取题库列表"""
-        banks = self.db.query(QuestionBank).filter(
+        """获取题库列表（题目总数与各题型数量由一次 LEFT JOIN + GROUP BY 查询得到）"""
+        type_columns = [
+            func.coalesce(func.sum(case((Question.type == question_type, 1), else_=0)), 0)
+            for question_type in QUESTION_TYPES
+        ]
+        rows = self.db.query(
+            QuestionBank,
+            func.count(Question.id),
+            *type_columns
+        ).outerjoin(
+            Question,
+            and_(Question.bank_id == QuestionBank.id, Question.is_active == True)
+        ).filter(
             QuestionBank.is_active == True
-        ).offset(skip).limit(limit).all()
-        
-        # 添加题目数量
-        for bank in banks:
-            bank.question_count = self.db.query(Question).filter(
-                Question.bank_id == bank.id,
-                Question.is_active == True
-            ).count()
-        
+        ).group_by(QuestionBank.id).offset(skip).limit(limit).all()
+        
+        banks = []
+        for bank, question_count, *type_counts in rows:
+            bank.question_count = question_count
+            bank.type_counts = {
+                question_type: int(count) for question_type, count in zip(QUESTION_TYPES, type_counts)
+            }
+            banks.append(bank)
         return banks
     
     def update_bank(self, bank_id: int, bank_data: QuestionBankUpdate) -> Optional[QuestionBank]:
@@ -237,17 +253,17 @@ class ExamService:
         is_correct = self._check_answer(question, answer)
         score = question.score if is_correct else 0
         
-        # 创建答题记录
-        db_answer = UserAnswer(
-            user_id=user_id,
-            question_id=question_id,
-            answer=answer,
-            is_correct=is_correct,
-            score=score,
-            time_spent=time_spent,
-            session_id=session_id
-        )
-        self.db.add(db_answer)
+        # 创建答题记录（启用延迟写入时由后台批量插入）
+        answer_row = {
+            "user_id": user_id,
+            "question_id": question_id,
+            "answer": answer,
+            "is_correct": is_correct,
+            "score": score,
+            "time_spent": time_spent,
+            "session_id": session_id,
+        }
+        db_answer = user_answer_log.submit(self.db, answer_row)
         
         # 更新考试会话
         exam_session = self.db.query(ExamSession).filter(
@@ -268,6 +284,9 @@ class ExamService:
         self._update_study_stats(user_id, question.bank_id, is_correct, score, time_spent)
         
         self.db.commit()
+        if db_answer is None:
+            # 延迟写入：记录尚未落库，返回的对象没有ID
+            return UserAnswer(**answer_row)
         self.db.refresh(db_answer)
         return db_answer
     
@@ -0,0 +1,375 @@
+import base64
+import bisect
+import json
+import threading
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.core.redis import get_redis
+from app.models.challenge import Challenge
+from app.models.user import User
+
+BOARDS = ("score", "solved")
+
+# 有序集合的分值把主排序键与次排序键编码为一个整数，排名与原 SQL 排序一致：
+# - score 榜：total_score * 10^6 + solved_count
+# - solved 榜：solved_count * 10^9 + total_score
+# 均小于 2^53，以 double 存储不会丢失精度
+SCORE_FACTOR = 10 ** 6
+SOLVED_FACTOR = 10 ** 9
+
+SCORE_KEY = "leaderboard:score"
+SOLVED_KEY = "leaderboard:solved"
+LAST_SUBMISSION_KEY = "leaderboard:last_submission"
+
+
+class RankEntry(NamedTuple):
+    rank: int
+    user_id: int
+    total_score: int
+    solved_count: int
+
+
+def _encode(board: str, total_score: int, solved_count: int) -> int:
+    if board == "solved":
+        return solved_count * SOLVED_FACTOR + total_score
+    return total_score * SCORE_FACTOR + solved_count
+
+
+def _decode(board: str, value: float) -> Tuple[int, int]:
+    """返回 (total_score, solved_count)"""
+    value = int(value)
+    if board == "solved":
+        return value % SOLVED_FACTOR, value // SOLVED_FACTOR
+    return value // SCORE_FACTOR, value % SCORE_FACTOR
+
+
+class MemoryLeaderboardStore:
+    """进程内排行榜（Redis 不可用时使用），按有序列表维护排名"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[int, Tuple[int, int]] = {}
+        self._last: Dict[int, str] = {}
+        # 每个榜单一个按 (-分值, user_id) 升序的列表
+        self._sorted: Dict[str, List[Tuple[int, int]]] = {board: [] for board in BOARDS}
+
+    def _key(self, board: str, user_id: int) -> Tuple[int, int]:
+        total_score, solved_count = self._totals[user_id]
+        return (-_encode(board, total_score, solved_count), user_id)
+
+    def record_completion(self, user_id: int, score: int, completed_at: Optional[datetime]) -> None:
+        with self._lock:
+            if user_id in self._totals:
+                for board in BOARDS:
+                    entries = self._sorted[board]
+                    del entries[bisect.bisect_left(entries, self._key(board, user_id))]
+            total_score, solved_count = self._totals.get(user_id, (0, 0))
+            self._totals[user_id] = (total_score + score, solved_count + 1)
+            for board in BOARDS:
+                bisect.insort(self._sorted[board], self._key(board, user_id))
+            if completed_at:
+                self._last[user_id] = completed_at.isoformat()
+
+    def replace_all(self, rows: List[Tuple[int, int, int, Optional[datetime]]]) -> None:
+        totals = {user_id: (total_score, solved_count) for user_id, total_score, solved_count, _ in rows}
+        last = {user_id: last_at.isoformat() for user_id, _, _, last_at in rows if last_at}
+        with self._lock:
+            self._totals = totals
+            self._last = last
+            self._sorted = {
+                board: sorted(
+                    (-_encode(board, total_score, solved_count), user_id)
+                    for user_id, (total_score, solved_count) in totals.items()
+                )
+                for board in BOARDS
+            }
+
+    def is_empty(self) -> bool:
+        return not self._totals
+
+    def range(self, board: str, start: int, stop: int) -> List[RankEntry]:
+        """按排名返回 [start, stop) 区间（从 0 开始）"""
+        with self._lock:
+            entries = self._sorted[board][max(start, 0):stop]
+            return [
+                RankEntry(start + i + 1, user_id, *self._totals[user_id])
+                for i, (_, user_id) in enumerate(entries)
+            ]
+
+    def rank(self, board: str, user_id: int) -> Optional[RankEntry]:
+        with self._lock:
+            if user_id not in self._totals:
+                return None
+            index = bisect.bisect_left(self._sorted[board], self._key(board, user_id))
+            return RankEntry(index + 1, user_id, *self._totals[user_id])
+
+    def last_submissions(self, user_ids: List[int]) -> Dict[int, Optional[str]]:
+        with self._lock:
+            return {user_id: self._last.get(user_id) for user_id in user_ids}
+
+
+class RedisLeaderboardStore:
+    """基于 Redis 有序集合的排行榜，排名查询为 O(log n)"""
+
+    _keys = {"score": SCORE_KEY, "solved": SOLVED_KEY}
+
+    def __init__(self, client):
+        self._redis = client
+
+    def record_completion(self, user_id: int, score: int, completed_at: Optional[datetime]) -> None:
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.zincrby(SCORE_KEY, _encode("score", score, 1), user_id)
+        pipe.zincrby(SOLVED_KEY, _encode("solved", score, 1), user_id)
+        if completed_at:
+            pipe.hset(LAST_SUBMISSION_KEY, user_id, completed_at.isoformat())
+        pipe.execute()
+
+    def replace_all(self, rows: List[Tuple[int, int, int, Optional[datetime]]]) -> None:
+        # 先写入临时键，再用 RENAME 原子替换，重建期间读请求不受影响
+        data = {
+            SCORE_KEY: {user_id: _encode("score", total_score, solved_count)
+                        for user_id, total_score, solved_count, _ in rows},
+            SOLVED_KEY: {user_id: _encode("solved", total_score, solved_count)
+                         for user_id, total_score, solved_count, _ in rows},
+            LAST_SUBMISSION_KEY: {user_id: last_at.isoformat()
+                                  for user_id, _, _, last_at in rows if last_at},
+        }
+        pipe = self._redis.pipeline(transaction=True)
+        for key, mapping in data.items():
+            tmp_key = f"{key}:rebuild"
+            pipe.delete(tmp_key)
+            if not mapping:
+                pipe.delete(key)
+                continue
+            if key == LAST_SUBMISSION_KEY:
+                pipe.hset(tmp_key, mapping=mapping)
+            else:
+                pipe.zadd(tmp_key, mapping)
+            pipe.rename(tmp_key, key)
+        pipe.execute()
+
+    def is_empty(self) -> bool:
+        return self._redis.zcard(SCORE_KEY) == 0
+
+    def range(self, board: str, start: int, stop: int) -> List[RankEntry]:
+        start = max(start, 0)
+        if stop <= start:
+            return []
+        members = self._redis.zrevrange(self._keys[board], start, stop - 1, withscores=True)
+        return [
+            RankEntry(start + i + 1, int(member), *_decode(board, value))
+            for i, (member, value) in enumerate(members)
+        ]
+
+    def rank(self, board: str, user_id: int) -> Optional[RankEntry]:
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.zrevrank(self._keys[board], user_id)
+        pipe.zscore(self._keys[board], user_id)
+        index, value = pipe.execute()
+        if index is None or value is None:
+            return None
+        return RankEntry(index + 1, user_id, *_decode(board, value))
+
+    def last_submissions(self, user_ids: List[int]) -> Dict[int, Optional[str]]:
+        if not user_ids:
+            return {}
+        values = self._redis.hmget(LAST_SUBMISSION_KEY, user_ids)
+        return dict(zip(user_ids, values))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_leaderboard_store():
+    """进程级排行榜存储：优先 Redis，不可用时使用进程内实现"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                client = get_redis()
+                _store = RedisLeaderboardStore(client) if client is not None else MemoryLeaderboardStore()
+    return _store
+
+
+def honor_title(solved_count: int) -> str:
+    tier = solved_count // 3
+    if tier <= 0:
+        return "新手入门"
+    if tier == 1:
+        return "初探江湖"
+    if tier == 2:
+        return "小有成就"
+    if tier == 3:
+        return "登堂入室"
+    if tier == 4:
+        return "炉火纯青"
+    if tier == 5:
+        return "登峰造极"
+    return "传说宗师"
+
+
+def encode_cursor(rank: int, best_time: int, completed_at: Optional[datetime], challenge_id: int) -> str:
+    """单题排行榜游标：上一页最后一行的排序键与名次"""
+    raw = json.dumps([rank, best_time, completed_at.isoformat() if completed_at else None, challenge_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int, datetime, int]:
+    try:
+        rank, best_time, completed_at, challenge_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return int(rank), int(best_time), datetime.fromisoformat(completed_at), int(challenge_id)
+    except Exception:
+        raise ValueError("无效的游标")
+
+
+class LeaderboardService:
+    def __init__(self, db: Session, store=None):
+        self.db = db
+        self.store = store or get_leaderboard_store()
+
+    def rebuild(self) -> int:
+        """从 challenges 表重新聚合并整体替换排行榜，返回上榜用户数"""
+        rows = (
+            self.db.query(
+                Challenge.user_id,
+                func.coalesce(func.sum(Challenge.score), 0),
+                func.count(Challenge.id),
+                func.max(Challenge.completed_at),
+            )
+            .filter(Challenge.is_completed == True)
+            .group_by(Challenge.user_id)
+            .all()
+        )
+        self.store.replace_all([
+            (user_id, int(total_score or 0), int(solved_count or 0), last_at)
+            for user_id, total_score, solved_count, last_at in rows
+        ])
+        return len(rows)
+
+    def ensure_loaded(self) -> None:
+        if self.store.is_empty():
+            self.rebuild()
+
+    def top(self, sort_by: str, limit: int) -> List[dict]:
+        entries = self.store.range(sort_by, 0, limit)
+        # 仅显示积分 > 1（或通过题数 > 1）的用户；榜单有序，遇到第一个不满足的即可截断
+        qualified = []
+        for entry in entries:
+            value = entry.solved_count if sort_by == "solved" else entry.total_score
+            if value <= 1:
+                break
+            qualified.append(entry)
+        return self._to_rows(qualified)
+
+    def my_rank(self, sort_by: str, user_id: int) -> Optional[dict]:
+        entry = self.store.rank(sort_by, user_id)
+        if entry is None:
+            return None
+        return self._to_rows([entry])[0]
+
+    def around(self, sort_by: str, user_id: int, radius: int) -> List[dict]:
+        entry = self.store.rank(sort_by, user_id)
+        if entry is None:
+            return []
+        start = max(entry.rank - 1 - radius, 0)
+        return self._to_rows(self.store.range(sort_by, start, entry.rank + radius))
+
+    def _to_rows(self, entries: List[RankEntry]) -> List[dict]:
+        if not entries:
+            return []
+        user_ids = [entry.user_id for entry in entries]
+        users = {
+            user.id: user
+            for user in self.db.query(User.id, User.username, User.full_name, User.avatar_url)
+            .filter(User.id.in_(user_ids))
+            .all()
+        }
+        last_submissions = self.store.last_submissions(user_ids)
+
+        rows = []
+        for entry in entries:
+            user = users.get(entry.user_id)
+            if user is None:
+                continue
+            rows.append({
+                "rank": entry.rank,
+                "user_id": entry.user_id,
+                "username": user.username,
+                "full_name": user.full_name,
+                "avatar_url": user.avatar_url,
+                "total_score": entry.total_score,
+                "solved_count": entry.solved_count,
+                "last_submission_at": last_submissions.get(entry.user_id),
+                "honor_title": honor_title(entry.solved_count),
+            })
+        return rows
+
+    def exercise_ranking(self, exercise_id: int, limit: int,
+                         cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """单题排行榜（按用时、通关时间升序），使用游标分页，深分页同样只走索引范围扫描
+
+        返回 (本页记录, 下一页游标)，没有更多数据时游标为 None。
+        """
+        query = (
+            self.db.query(
+                Challenge.id,
+                Challenge.best_time,
+                Challenge.completed_at,
+                Challenge.score,
+                User.id.label("user_id"),
+                User.username,
+                User.full_name,
+                User.avatar_url,
+            )
+            .join(User, User.id == Challenge.user_id)
+            .filter(
+                Challenge.exercise_id == exercise_id,
+                Challenge.is_completed == True,
+                Challenge.best_time.isnot(None),
+                Challenge.completed_at.isnot(None),
+            )
+        )
+
+        rank = 0
+        if cursor:
+            rank, best_time, completed_at, challenge_id = decode_cursor(cursor)
+            query = query.filter(or_(
+                Challenge.best_time > best_time,
+                and_(Challenge.best_time == best_time, or_(
+                    Challenge.completed_at > completed_at,
+                    and_(Challenge.completed_at == completed_at, Challenge.id > challenge_id),
+                )),
+            ))
+
+        rows = (
+            query.order_by(Challenge.best_time.asc(), Challenge.completed_at.asc(), Challenge.id.asc())
+            .limit(limit + 1)
+            .all()
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        entries = []
+        for row in rows:
+            rank += 1
+            entries.append({
+                "rank": rank,
+                "user_id": row.user_id,
+                "username": row.username,
+                "full_name": row.full_name,
+                "avatar_url": row.avatar_url,
+                "score": row.score or 0,
+                "completed_at": row.completed_at.isoformat(),
+                "time_spent": row.best_time,
+            })
+
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            next_cursor = encode_cursor(rank, last.best_time, last.completed_at, last.id)
+        return entries, next_cursor
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.models.study_note import StudyNote
 from app.schemas.study_note import StudyNoteCreate, StudyNoteUpdate
+from app.services.view_counter import study_note_views
 
 
 class StudyNoteService:
@@ -36,9 +37,8 @@ class StudyNoteService:
     def get(self, note_id: int, user_id: int) -> Optional[StudyNote]:
         note = self.db.query(StudyNote).filter(StudyNote.id == note_id, StudyNote.user_id == user_id).first()
         if note:
-            # 增加阅读次数
-            note.view_count += 1
-            self.db.commit()
+            # 增加阅读次数（缓冲后批量写入）
+            study_note_views.hit(self.db, note)
         return note
 
     def list(self, user_id: int, skip: int = 0, limit: int = 20) -> List[StudyNote]:
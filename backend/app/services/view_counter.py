@@ -0,0 +1,115 @@
+import logging
+import threading
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core import database
+from app.core.config import settings
+from app.models.exercise import Exercise
+from app.models.study_note import StudyNote
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class ViewCounter:
+    """访问次数缓冲：读请求只在内存中累加，后台线程定期批量写入
+
+    写入使用 UPDATE ... SET view_count = view_count + :delta，多个 worker 各自累加自己的增量，
+    互不覆盖。后台线程未启动时（如脚本中调用）退化为在调用方会话中立即自增并提交。
+    """
+
+    def __init__(self, model, flush_interval: float = 10):
+        self.model = model
+        self.table = model.__table__
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._statement = (
+            update(self.table)
+            .where(self.table.c.id == bindparam("b_id"))
+            .values(view_count=self.table.c.view_count + bindparam("b_delta"))
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"view-counter-{self.table.name}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台线程并写入剩余增量（应用关闭时调用）"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def hit(self, db: Session, record) -> None:
+        """记录一次访问，并让返回给调用方的对象包含尚未写入的增量"""
+        if not self.running:
+            db.execute(
+                update(self.model)
+                .where(self.model.id == record.id)
+                .values(view_count=self.model.view_count + 1)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            return
+
+        with self._lock:
+            self._pending[record.id] += 1
+            pending = self._pending[record.id]
+        # 只修改已加载的值，不标记为脏数据，避免调用方后续提交时覆盖计数
+        set_committed_value(record, "view_count", (record.view_count or 0) + pending)
+
+    def flush(self) -> int:
+        """批量写入累计的增量，返回更新的行数"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+
+        params = [{"b_id": record_id, "b_delta": delta} for record_id, delta in pending.items()]
+        try:
+            with database.engine.begin() as conn:
+                conn.execute(self._statement, params)
+        except Exception as e:
+            logger.exception("Failed to flush %s view counts: %s", self.table.name, e)
+            with self._lock:
+                # 放回缓冲区，下次重试
+                self._pending.update(pending)
+            return 0
+        return len(params)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+exercise_views = ViewCounter(Exercise, flush_interval=settings.VIEW_COUNT_FLUSH_SECONDS)
+study_note_views = ViewCounter(StudyNote, flush_interval=settings.VIEW_COUNT_FLUSH_SECONDS)
+
+VIEW_COUNTERS = (exercise_views, study_note_views)
+
+
+def start_view_counters() -> None:
+    for counter in VIEW_COUNTERS:
+        counter.start()
+
+
+def stop_view_counters() -> None:
+    for counter in VIEW_COUNTERS:
+        counter.stop()
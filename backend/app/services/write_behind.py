@@ -0,0 +1,178 @@
+import logging
+import queue
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import Table, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.core.config import settings
+from app.models.challenge import ChallengeSubmission
+from app.models.knowledge_base import UserAnswer
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class WriteBehindBuffer:
+    """只追加日志表的延迟写入缓冲区
+
+    请求线程把行数据放入有界队列，后台线程每 flush_interval_ms 毫秒或攒满 batch_size 行
+    用一条多行 INSERT 写入。队列已满（背压）或缓冲区未启动时，由调用方在自己的事务内同步插入。
+
+    timestamp_column 为使用 server_default=func.now() 的时间字段：同步插入时交给数据库默认值；
+    进入队列的行在入队时按数据库时钟（启动时测得的与 NOW() 的偏差）补上，与同步插入的时间一致。
+    """
+
+    def __init__(self, model, timestamp_column: Optional[str] = None, batch_size: int = 500,
+                 flush_interval_ms: int = 200, max_queue: int = 10000):
+        self.model = model
+        self.table: Table = model.__table__
+        self.timestamp_column = timestamp_column
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._clock_offset = timedelta(0)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._sync_clock()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"write-behind-{self.table.name}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台线程并写入剩余数据（应用关闭时调用）"""
+        if self._thread is not None:
+            self._stop.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _sync_clock(self) -> None:
+        """测量数据库 NOW() 与本机时钟的偏差（数据库时区可能与应用不同）"""
+        try:
+            with database.engine.connect() as conn:
+                db_now = conn.execute(select(func.now())).scalar()
+            self._clock_offset = db_now.replace(tzinfo=None) - datetime.now()
+        except Exception as e:
+            logger.warning("Failed to read database clock for %s, using local time: %s", self.table.name, e)
+            self._clock_offset = timedelta(0)
+
+    def now(self) -> datetime:
+        """按数据库时钟的当前时间（与 server_default=func.now() 写入的值一致）"""
+        return datetime.now() + self._clock_offset
+
+    def submit(self, db: Session, row: dict):
+        """写入一行日志
+
+        进入队列时返回 None（并补上时间字段）；否则创建模型对象加入 db 会话
+        （随调用方事务提交，时间字段使用数据库默认值）并返回该对象。
+        """
+        if self.running:
+            try:
+                queued = dict(row)
+                if self.timestamp_column and queued.get(self.timestamp_column) is None:
+                    queued[self.timestamp_column] = self.now()
+                self._queue.put_nowait(queued)
+                row.update(queued)
+                if self._queue.qsize() >= self.batch_size:
+                    self._wakeup.set()
+                return None
+            except queue.Full:
+                logger.warning("Write-behind queue for %s is full, inserting synchronously", self.table.name)
+        record = self.model(**row)
+        db.add(record)
+        return record
+
+    def count_pending(self, **match) -> int:
+        """队列中尚未写入、且各字段与 match 相同的行数"""
+        with self._queue.mutex:
+            rows = list(self._queue.queue)
+        return sum(1 for row in rows if all(row.get(key) == value for key, value in match.items()))
+
+    def flush(self) -> int:
+        """写入队列中的全部数据，返回写入行数"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                rows = self._drain()
+                if not rows:
+                    return written
+                try:
+                    with database.engine.begin() as conn:
+                        conn.execute(insert(self.table), rows)
+                    written += len(rows)
+                except Exception as e:
+                    logger.exception("Write-behind flush for %s failed, retrying row by row: %s", self.table.name, e)
+                    written += self._insert_one_by_one(rows)
+
+    def _drain(self) -> List[dict]:
+        rows = []
+        while len(rows) < self.batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _insert_one_by_one(self, rows: List[dict]) -> int:
+        # 批量写入失败时逐行重试，只丢弃自身有问题的行
+        written = 0
+        for row in rows:
+            try:
+                with database.engine.begin() as conn:
+                    conn.execute(insert(self.table), row)
+                written += 1
+            except Exception as e:
+                logger.error("Dropping %s row %s: %s", self.table.name, row, e)
+        return written
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.exception("Write-behind flush for %s failed: %s", self.table.name, e)
+
+
+def _buffer_for(model, timestamp_column: str) -> WriteBehindBuffer:
+    return WriteBehindBuffer(
+        model,
+        timestamp_column=timestamp_column,
+        batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+        flush_interval_ms=settings.WRITE_BEHIND_FLUSH_MS,
+        max_queue=settings.WRITE_BEHIND_QUEUE_SIZE,
+    )
+
+
+challenge_submission_log = _buffer_for(ChallengeSubmission, "submitted_at")
+user_answer_log = _buffer_for(UserAnswer, "created_at")
+
+WRITE_BEHIND_BUFFERS = (challenge_submission_log, user_answer_log)
+
+
+def start_write_behind() -> None:
+    if settings.WRITE_BEHIND_ENABLED:
+        for buffer in WRITE_BEHIND_BUFFERS:
+            buffer.start()
+
+
+def stop_write_behind() -> None:
+    for buffer in WRITE_BEHIND_BUFFERS:
+        buffer.stop()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+题目验证器基准测试
+
+加载注册表中的全部验证器，分别测量 get_public_params()、有效提交与无效提交的 validate()，
+输出每个验证器的 ops/sec 与 p50/p99 延迟（JSON），便于不同版本之间对比。
+用法：
+    python bench_validators.py [--iterations 2000] [--warmup 100] [--exercises 1,2] [--output result.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.challenge_validators.registry import discover_validators, get_validator_for_exercise
+from app.schemas.challenge import ChallengeSubmission
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def measure(func, iterations, warmup):
+    """执行 func 并返回统计结果（延迟单位：微秒）"""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    truthy = 0
+    started = time.perf_counter_ns()
+    for _ in range(iterations):
+        t0 = time.perf_counter_ns()
+        result = func()
+        samples.append(time.perf_counter_ns() - t0)
+        if result:
+            truthy += 1
+    elapsed = (time.perf_counter_ns() - started) / 1e9
+
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / elapsed, 1) if elapsed else None,
+        "p50_us": round(percentile(samples, 0.50) / 1000, 2),
+        "p99_us": round(percentile(samples, 0.99) / 1000, 2),
+        "max_us": round(samples[-1] / 1000, 2),
+        "truthy": truthy,
+    }
+
+def bench_validator(exercise_id, validator, iterations, warmup):
+    user = SimpleNamespace(id=1, username="bench")
+    result = {
+        "exercise_id": exercise_id,
+        "validator": type(validator).__name__,
+        "get_public_params": measure(
+            lambda: validator.get_public_params(user=user, exercise_id=exercise_id), iterations, warmup
+        ),
+    }
+
+    public_params = validator.get_public_params(user=user, exercise_id=exercise_id)
+    example = getattr(validator, "example_submission", None)
+    if example is None:
+        result["skipped"] = "验证器未实现 example_submission，无法构造提交"
+        return result
+
+    # 提交在计时前构造好，只测量 validate() 本身
+    for name, valid in (("validate_valid", True), ("validate_invalid", False)):
+        submission = ChallengeSubmission(**example(exercise_id, public_params, valid=valid))
+        result[name] = measure(
+            lambda: validator.validate(
+                submission=submission, user=user, exercise_id=exercise_id, public_params=public_params
+            ),
+            iterations,
+            warmup,
+        )
+    return result
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except Exception:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="题目验证器基准测试")
+    parser.add_argument("--iterations", type=int, default=2000, help="每项测量的调用次数")
+    parser.add_argument("--warmup", type=int, default=100, help="预热调用次数")
+    parser.add_argument("--exercises", help="只测试指定题目ID（逗号分隔）")
+    parser.add_argument("--output", help="结果写入文件，默认输出到标准输出")
+    args = parser.parse_args()
+
+    exercise_ids = sorted(discover_validators())
+    if args.exercises:
+        wanted = {int(item) for item in args.exercises.split(",") if item.strip()}
+        exercise_ids = [exercise_id for exercise_id in exercise_ids if exercise_id in wanted]
+
+    results = []
+    for exercise_id in exercise_ids:
+        validator = get_validator_for_exercise(exercise_id)
+        if validator is None:
+            results.append({"exercise_id": exercise_id, "skipped": "验证器加载失败"})
+            continue
+        print(f"⏱️  测试题目 {exercise_id}（{type(validator).__name__}）...", file=sys.stderr)
+        results.append(bench_validator(exercise_id, validator, args.iterations, args.warmup))
+
+    report = {
+        "version": settings.VERSION,
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": datetime.utcnow().isoformat(),
+        "iterations": args.iterations,
+        "results": results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"✅ 结果已写入 {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
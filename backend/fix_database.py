@@ -118,6 +118,29 @@ def fix_database():
             else:
                 print(f"添加 avg_time 字段失败: {e}")
         
+        try:
+            conn.execute(text(
+                "CREATE INDEX ix_exercise_submissions_user_progress "
+                "ON exercise_submissions (user_id, exercise_id, is_correct, score)"
+            ))
+            print("添加用户进度索引 ix_exercise_submissions_user_progress")
+        except Exception as e:
+            if "Duplicate key name" in str(e):
+                print("ix_exercise_submissions_user_progress 索引已存在")
+            else:
+                print(f"添加 ix_exercise_submissions_user_progress 索引失败: {e}")
+        
+        try:
+            conn.execute(text(
+                "CREATE INDEX ix_questions_bank_type ON questions (bank_id, is_active, type)"
+            ))
+            print("添加题库统计索引 ix_questions_bank_type")
+        except Exception as e:
+            if "Duplicate key name" in str(e):
+                print("ix_questions_bank_type 索引已存在")
+            else:
+                print(f"添加 ix_questions_bank_type 索引失败: {e}")
+        
         # 检查是否有数据
         result = conn.execute(text("SELECT COUNT(*) FROM exercises"))
         count = result.scalar()
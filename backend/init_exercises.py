@@ -9,10 +9,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal, engine, Base
-from app.models.exercise import Exercise
-
-# 创建所有表
-Base.metadata.create_all(bind=engine)
+from app.models.exercise import Exercise, ExerciseTag
+from app.services.exercise_catalog import normalize_tags
 
 # 题目数据 - 100道爬虫逆向题目
 exercises_data = [
@@ -929,22 +927,27 @@ exercises_data = [
 
 def init_exercises():
     """初始化题目数据"""
+    # 创建所有表（放在函数内，导入 exercises_data 时不连接数据库）
+    Base.metadata.create_all(bind=engine)
     db = SessionLocal()
     try:
         # 检查是否已有数据
         existing_count = db.query(Exercise).count()
         if existing_count > 0:
-            print(f"数据库中已有 {existing_count} 道题目，跳过初始化")
+            print(f"数据库中已有 {existing_count} 道题目，跳过初始化（同步题目修改请使用 sync_exercises.py）")
             return
         
         # 插入题目数据
         for exercise_data in exercises_data:
+            # 与接口、迁移脚本一致的标签规范化（去空白、去重）
+            tags = normalize_tags(exercise_data["tags"])
             exercise = Exercise(
                 title=exercise_data["title"],
                 description=exercise_data["description"],
                 difficulty=exercise_data["difficulty"],
                 challenge_points=exercise_data["challenge_points"],
-                tags=json.dumps(exercise_data["tags"], ensure_ascii=False),
+                tags=json.dumps(tags, ensure_ascii=False),
+                tag_links=[ExerciseTag(tag=tag) for tag in tags],
                 points=exercise_data["points"],
                 sort_order=exercise_data["sort_order"],
                 is_active=True
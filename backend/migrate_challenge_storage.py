@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+挑战数据迁移：由保存完整 1000 个数字的 JSON 块改为仅保存种子版本与 total_sum
+
+离线分批升级旧格式挑战，每批一次批量 UPDATE，请求路径只需比较 data_version。
+用法：
+    python migrate_challenge_storage.py [--batch-size 1000] [--skip-schema] [--dry-run]
+"""
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import bindparam, or_, select, text, update
+from app.core.database import engine
+from app.models.challenge import Challenge
+from app.services.challenge_service import CHALLENGE_DATA_VERSION, calculate_total_sum
+
+def migrate_schema():
+    """调整 challenges 表结构"""
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("ALTER TABLE challenges ADD COLUMN data_version INT NULL"))
+            print("添加 data_version 字段")
+        except Exception as e:
+            if "Duplicate column name" in str(e):
+                print("data_version 字段已存在")
+            else:
+                print(f"添加 data_version 字段失败: {e}")
+
+        conn.execute(text("ALTER TABLE challenges MODIFY COLUMN numbers_data TEXT NULL"))
+        print("numbers_data 字段已改为可空")
+
+        try:
+            conn.execute(text(
+                "CREATE INDEX ix_challenges_exercise_ranking "
+                "ON challenges (exercise_id, is_completed, best_time, completed_at, id)"
+            ))
+            print("添加单题排行榜索引 ix_challenges_exercise_ranking")
+        except Exception as e:
+            if "Duplicate key name" in str(e):
+                print("ix_challenges_exercise_ranking 索引已存在")
+            else:
+                print(f"添加 ix_challenges_exercise_ranking 索引失败: {e}")
+        conn.commit()
+
+def migrate_rows(batch_size: int = 1000, dry_run: bool = False) -> int:
+    """按主键分批将旧格式挑战转换为新格式并清空数字块，返回升级条数"""
+    legacy = or_(
+        Challenge.data_version.is_(None),
+        Challenge.data_version != CHALLENGE_DATA_VERSION,
+    )
+    stmt = (
+        update(Challenge.__table__)
+        .where(Challenge.__table__.c.id == bindparam("b_id"))
+        .values(
+            total_sum=bindparam("b_total_sum"),
+            numbers_data=None,
+            data_version=CHALLENGE_DATA_VERSION,
+        )
+    )
+
+    upgraded = 0
+    last_id = 0
+    with engine.connect() as conn:
+        while True:
+            # 只读取主键与种子相关字段，不加载旧的数字块
+            rows = conn.execute(
+                select(Challenge.id, Challenge.user_id, Challenge.exercise_id)
+                .where(legacy, Challenge.id > last_id)
+                .order_by(Challenge.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            params = [
+                {"b_id": row.id, "b_total_sum": calculate_total_sum(row.user_id, row.exercise_id)}
+                for row in rows
+            ]
+            if not dry_run:
+                conn.execute(stmt, params)
+                conn.commit()
+
+            upgraded += len(rows)
+            last_id = rows[-1].id
+            print(f"已处理 {upgraded} 条（最后 id={last_id}）")
+
+    return upgraded
+
+def main():
+    parser = argparse.ArgumentParser(description="升级旧格式挑战数据")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批升级的行数")
+    parser.add_argument("--skip-schema", action="store_true", help="跳过表结构调整")
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不写入")
+    args = parser.parse_args()
+
+    try:
+        if not args.skip_schema and not args.dry_run:
+            migrate_schema()
+        upgraded = migrate_rows(batch_size=args.batch_size, dry_run=args.dry_run)
+        action = "需升级" if args.dry_run else "已升级"
+        print(f"✅ 挑战数据迁移完成！{action} {upgraded} 条")
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+题目完成用时统计迁移：添加分位数字段，并由历史数据重建每道题的用时草图
+
+历史数据包括题目提交（exercise_submissions 中答对且有用时的记录）与挑战通关（challenges.best_time），
+与在线更新的两条路径一致。重建后 avg_time 也改为真实平均值。
+用法：
+    python migrate_completion_times.py [--skip-schema] [--dry-run]
+"""
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from collections import defaultdict
+from sqlalchemy import bindparam, select, text, update
+from app.core.database import engine
+from app.models.challenge import Challenge
+from app.models.exercise import Exercise, ExerciseSubmission
+from app.services.completion_times import DDSketch
+
+NEW_COLUMNS = [
+    ("p50_time", "INT NULL"),
+    ("p90_time", "INT NULL"),
+    ("p99_time", "INT NULL"),
+    ("time_sketch", "TEXT NULL"),
+]
+
+def migrate_schema():
+    """为 exercises 表添加分位数与草图字段"""
+    with engine.connect() as conn:
+        for column, definition in NEW_COLUMNS:
+            try:
+                conn.execute(text(f"ALTER TABLE exercises ADD COLUMN {column} {definition}"))
+                print(f"添加 {column} 字段")
+            except Exception as e:
+                if "Duplicate column name" in str(e):
+                    print(f"{column} 字段已存在")
+                else:
+                    print(f"添加 {column} 字段失败: {e}")
+        conn.commit()
+
+def build_sketches(conn):
+    """流式读取历史用时，按题目构建草图（两个来源分别构建后合并）"""
+    sources = [
+        select(ExerciseSubmission.exercise_id, ExerciseSubmission.time_spent).where(
+            ExerciseSubmission.is_correct == True,
+            ExerciseSubmission.time_spent > 0,
+        ),
+        select(Challenge.exercise_id, Challenge.best_time).where(
+            Challenge.is_completed == True,
+            Challenge.best_time.isnot(None),
+        ),
+    ]
+
+    sketches = defaultdict(DDSketch)
+    for stmt in sources:
+        partial = defaultdict(DDSketch)
+        for exercise_id, time_spent in conn.execution_options(stream_results=True).execute(stmt):
+            partial[exercise_id].add(time_spent)
+        for exercise_id, sketch in partial.items():
+            sketches[exercise_id].merge(sketch)
+    return sketches
+
+def migrate_rows(dry_run: bool = False) -> int:
+    """重建全部题目的用时统计，返回有用时数据的题目数"""
+    stmt = (
+        update(Exercise.__table__)
+        .where(Exercise.__table__.c.id == bindparam("b_id"))
+        .values(
+            time_sketch=bindparam("b_time_sketch"),
+            avg_time=bindparam("b_avg_time"),
+            p50_time=bindparam("b_p50_time"),
+            p90_time=bindparam("b_p90_time"),
+            p99_time=bindparam("b_p99_time"),
+        )
+    )
+
+    with engine.connect() as conn:
+        sketches = build_sketches(conn)
+        exercise_ids = conn.execute(select(Exercise.id)).scalars().all()
+
+        params = []
+        for exercise_id in exercise_ids:
+            sketch = sketches.get(exercise_id)
+            if sketch is None:
+                # 没有历史用时：清空旧的（按错误公式计算的）平均用时
+                row = {"b_id": exercise_id, "b_time_sketch": None}
+                row.update({f"b_{column}": None for column in ("avg_time", "p50_time", "p90_time", "p99_time")})
+            else:
+                row = {"b_id": exercise_id, "b_time_sketch": sketch.to_json()}
+                row.update({f"b_{column}": value for column, value in sketch.summary().items()})
+                print(f"题目 {exercise_id}: {sketch.count} 次完成，p50={row['b_p50_time']}s "
+                      f"p90={row['b_p90_time']}s p99={row['b_p99_time']}s")
+            params.append(row)
+
+        if params and not dry_run:
+            conn.execute(stmt, params)
+            conn.commit()
+
+    return len(sketches)
+
+def main():
+    parser = argparse.ArgumentParser(description="重建题目完成用时统计")
+    parser.add_argument("--skip-schema", action="store_true", help="跳过表结构调整")
+    parser.add_argument("--dry-run", action="store_true", help="只计算，不写入")
+    args = parser.parse_args()
+
+    try:
+        if not args.skip_schema and not args.dry_run:
+            migrate_schema()
+        rebuilt = migrate_rows(dry_run=args.dry_run)
+        action = "计算" if args.dry_run else "重建"
+        print(f"✅ 完成用时统计迁移完成！共{action} {rebuilt} 道题目")
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+题目标签迁移：把 exercises.tags 中的 JSON 标签数组回填到规范化的 exercise_tags 表
+
+可重复执行：按题目比较 JSON 标签与已有标签行，只插入缺少的、删除多余的。
+用法：
+    python migrate_exercise_tags.py [--skip-schema] [--dry-run]
+"""
+import argparse
+import json
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from collections import defaultdict
+from sqlalchemy import delete, insert, select, tuple_
+from app.core.database import engine
+from app.models.exercise import Exercise, ExerciseTag
+from app.services.exercise_catalog import normalize_tags
+
+def migrate_schema():
+    """创建 exercise_tags 表（已存在时跳过）"""
+    ExerciseTag.__table__.create(bind=engine, checkfirst=True)
+    print("exercise_tags 表已就绪")
+
+def parse_tags(value):
+    if not value:
+        return []
+    try:
+        tags = json.loads(value)
+    except json.JSONDecodeError:
+        return []
+    return normalize_tags(tags if isinstance(tags, list) else [])
+
+def migrate_rows(dry_run: bool = False):
+    """回填标签，返回 (插入行数, 删除行数)"""
+    with engine.connect() as conn:
+        exercises = conn.execute(select(Exercise.id, Exercise.tags)).all()
+        existing = defaultdict(set)
+        for row in conn.execute(select(ExerciseTag.exercise_id, ExerciseTag.tag)):
+            existing[row.exercise_id].add(row.tag)
+
+        to_insert = []
+        to_delete = []
+        for exercise in exercises:
+            wanted = parse_tags(exercise.tags)
+            current = existing.get(exercise.id, set())
+            to_insert.extend(
+                {"exercise_id": exercise.id, "tag": tag} for tag in wanted if tag not in current
+            )
+            to_delete.extend((exercise.id, tag) for tag in current - set(wanted))
+
+        if not dry_run:
+            if to_insert:
+                conn.execute(insert(ExerciseTag.__table__), to_insert)
+            if to_delete:
+                conn.execute(
+                    delete(ExerciseTag.__table__).where(
+                        tuple_(ExerciseTag.exercise_id, ExerciseTag.tag).in_(to_delete)
+                    )
+                )
+            conn.commit()
+
+    return len(to_insert), len(to_delete)
+
+def main():
+    parser = argparse.ArgumentParser(description="回填规范化的题目标签表")
+    parser.add_argument("--skip-schema", action="store_true", help="跳过建表")
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不写入")
+    args = parser.parse_args()
+
+    try:
+        if not args.skip_schema and not args.dry_run:
+            migrate_schema()
+        inserted, deleted = migrate_rows(dry_run=args.dry_run)
+        action = "需" if args.dry_run else "已"
+        print(f"✅ 题目标签迁移完成！{action}插入 {inserted} 条，{action}删除 {deleted} 条")
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
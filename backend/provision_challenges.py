@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+挑战预生成：在班级/比赛开始前为一批用户 × 题目提前创建挑战记录
+
+避免比赛开始时大量用户首次访问同时触发挑战生成与插入。
+已存在的挑战会被跳过，可重复执行。
+用法：
+    python provision_challenges.py [--users 1,2,3] [--exercises 1,2] [--chunk-size 1000] [--workers 4] [--dry-run]
+"""
+import argparse
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import insert, select, tuple_
+from app.core.database import engine
+from app.models.challenge import Challenge
+from app.models.exercise import Exercise
+from app.models.user import User
+from app.services.challenge_service import CHALLENGE_DATA_VERSION, calculate_total_sums
+
+def parse_ids(value):
+    if not value:
+        return None
+    return [int(item) for item in value.split(",") if item.strip()]
+
+def load_targets(conn, user_ids, exercise_ids):
+    """确定要预生成的用户与题目（题目参数支持 ID 或 sort_order）"""
+    user_query = select(User.id).where(User.is_active == True).order_by(User.id)
+    if user_ids:
+        user_query = user_query.where(User.id.in_(user_ids))
+    users = list(conn.execute(user_query).scalars())
+
+    exercise_query = select(Exercise.id).where(Exercise.is_active == True).order_by(Exercise.id)
+    if exercise_ids:
+        exercise_query = exercise_query.where(
+            Exercise.id.in_(exercise_ids) | Exercise.sort_order.in_(exercise_ids)
+        )
+    exercises = list(conn.execute(exercise_query).scalars())
+    return users, exercises
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def provision(user_ids=None, exercise_ids=None, chunk_size=1000, workers=1, dry_run=False) -> int:
+    """批量创建缺失的挑战，返回新建条数"""
+    created = 0
+    with engine.connect() as conn:
+        users, exercises = load_targets(conn, user_ids, exercise_ids)
+        print(f"目标：{len(users)} 名用户 × {len(exercises)} 道题目")
+        pairs = [(user_id, exercise_id) for user_id in users for exercise_id in exercises]
+
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for chunk in chunked(pairs, chunk_size):
+                existing = set(conn.execute(
+                    select(Challenge.user_id, Challenge.exercise_id)
+                    .where(tuple_(Challenge.user_id, Challenge.exercise_id).in_(chunk))
+                ).all())
+                missing = [pair for pair in chunk if pair not in existing]
+                if not missing:
+                    continue
+
+                if executor:
+                    parts = list(chunked(missing, max(1, len(missing) // workers + 1)))
+                    totals = [total for part in executor.map(calculate_total_sums, parts) for total in part]
+                else:
+                    totals = calculate_total_sums(missing)
+
+                rows = [
+                    {
+                        "user_id": user_id,
+                        "exercise_id": exercise_id,
+                        "numbers_data": None,
+                        "data_version": CHALLENGE_DATA_VERSION,
+                        "total_sum": total,
+                        "is_completed": False,
+                        "attempts": 0,
+                    }
+                    for (user_id, exercise_id), total in zip(missing, totals)
+                ]
+                if not dry_run:
+                    conn.execute(insert(Challenge.__table__), rows)
+                    conn.commit()
+
+                created += len(rows)
+                print(f"已处理 {created} 条")
+        finally:
+            if executor:
+                executor.shutdown()
+
+    return created
+
+def main():
+    parser = argparse.ArgumentParser(description="批量预生成挑战")
+    parser.add_argument("--users", help="用户ID列表（逗号分隔），默认全部启用用户")
+    parser.add_argument("--exercises", help="题目ID或sort_order列表（逗号分隔），默认全部启用题目")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="每批插入的行数")
+    parser.add_argument("--workers", type=int, default=1, help="计算答案的进程数")
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不写入")
+    args = parser.parse_args()
+
+    try:
+        created = provision(
+            user_ids=parse_ids(args.users),
+            exercise_ids=parse_ids(args.exercises),
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            dry_run=args.dry_run,
+        )
+        action = "需创建" if args.dry_run else "已创建"
+        print(f"✅ 挑战预生成完成！{action} {created} 条")
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
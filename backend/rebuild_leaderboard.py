@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+从 challenges 表重建排行榜（Redis 有序集合）
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import SessionLocal
+from app.services.leaderboard_service import LeaderboardService
+
+def rebuild_leaderboard():
+    """重建排行榜"""
+    db = SessionLocal()
+    try:
+        count = LeaderboardService(db).rebuild()
+        print(f"✅ 排行榜重建完成，共 {count} 名用户")
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild_leaderboard()
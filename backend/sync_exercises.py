@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+同步题目数据：以 sort_order 为键，把题目源数据批量写入数据库（可重复执行）
+
+读取数据库中全部题目，与源数据逐条比较，只新增缺少的题目、更新内容有变化的题目，
+并同步 exercise_tags 表；所有写入在一个事务内用 executemany 完成。
+源数据默认使用 init_exercises.py 中的题目列表，也可通过 --source 指定 JSON 文件（题目对象数组）。
+已有题目只比较、更新源数据中显式给出的字段，省略的字段（如 tags、points、is_active）保留数据库中的值。
+用法：
+    python sync_exercises.py [--source exercises.json] [--deactivate-missing] [--dry-run]
+"""
+import argparse
+import json
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from app.core.database import engine
+from app.models.exercise import Exercise, ExerciseTag
+from app.schemas.exercise import ExerciseCreate
+from app.services.exercise_catalog import normalize_tags
+
+# 参与比较与更新的字段（sort_order 为键）
+FIELDS = ("title", "description", "difficulty", "challenge_points", "tags", "points", "is_active")
+
+def load_source(path=None):
+    """读取并校验源数据，返回 sort_order -> (ExerciseCreate, 显式给出的字段)"""
+    if path:
+        with open(path, encoding="utf-8") as f:
+            items = json.load(f)
+    else:
+        from init_exercises import exercises_data
+        items = exercises_data
+
+    source = {}
+    for item in items:
+        exercise = ExerciseCreate(**item)
+        if exercise.sort_order in source:
+            raise ValueError(f"源数据中 sort_order={exercise.sort_order} 重复")
+        # 先取显式给出的字段：给 tags 赋值后 pydantic 会把它也记为已设置
+        fields_set = set(exercise.model_fields_set)
+        exercise.tags = normalize_tags(exercise.tags)
+        source[exercise.sort_order] = (exercise, fields_set)
+    return source
+
+def parse_tags(value):
+    try:
+        tags = json.loads(value) if value else []
+    except json.JSONDecodeError:
+        return []
+    return normalize_tags(tags if isinstance(tags, list) else [])
+
+def plan_changes(conn, source, deactivate_missing=False):
+    """比较源数据与数据库，返回待执行的变更"""
+    rows = conn.execute(
+        select(Exercise.id, Exercise.sort_order, *[getattr(Exercise, field) for field in FIELDS])
+        .order_by(Exercise.id)
+    ).all()
+
+    existing = {}
+    for row in rows:
+        if row.sort_order in existing:
+            # 与题目解析一致：同一 sort_order 以 id 最小的题目为准
+            print(f"⚠️  sort_order={row.sort_order} 有多道题目，只同步 id={existing[row.sort_order].id}")
+            continue
+        existing[row.sort_order] = row
+
+    changes = {"insert": [], "update": [], "deactivate": [], "unchanged": 0}
+    for sort_order, (exercise, fields_set) in sorted(source.items()):
+        row = existing.get(sort_order)
+        if row is None:
+            changes["insert"].append(exercise)
+            continue
+
+        changed = []
+        for field in FIELDS:
+            if field not in fields_set:
+                # 省略的字段取的是模型默认值，不能用来覆盖已有数据
+                continue
+            current = parse_tags(row.tags) if field == "tags" else getattr(row, field)
+            if current != getattr(exercise, field):
+                changed.append(field)
+        if changed:
+            changes["update"].append((row, exercise, changed))
+        else:
+            changes["unchanged"] += 1
+
+    if deactivate_missing:
+        changes["deactivate"] = [
+            row for sort_order, row in sorted(existing.items())
+            if sort_order not in source and row.is_active
+        ]
+    return changes
+
+def to_values(exercise, fields=FIELDS + ("sort_order",), prefix=""):
+    values = {}
+    for field in fields:
+        value = getattr(exercise, field)
+        values[f"{prefix}{field}"] = json.dumps(value, ensure_ascii=False) if field == "tags" else value
+    return values
+
+def apply_changes(conn, changes):
+    """在当前事务内批量执行变更"""
+    table = Exercise.__table__
+    tag_table = ExerciseTag.__table__
+    tag_rows = []
+
+    if changes["insert"]:
+        conn.execute(insert(table), [to_values(exercise) for exercise in changes["insert"]])
+        sort_orders = [exercise.sort_order for exercise in changes["insert"]]
+        new_ids = {}
+        for row in conn.execute(
+            select(Exercise.id, Exercise.sort_order)
+            .where(Exercise.sort_order.in_(sort_orders))
+            .order_by(Exercise.id.desc())
+        ):
+            # 同一 sort_order 以刚插入的（id 最大的）为准
+            new_ids.setdefault(row.sort_order, row.id)
+        for exercise in changes["insert"]:
+            tag_rows.extend(
+                {"exercise_id": new_ids[exercise.sort_order], "tag": tag} for tag in exercise.tags
+            )
+
+    # executemany 要求每行参数一致：只写入有变化的字段，按变化的字段组合分组
+    groups = {}
+    for row, exercise, changed in changes["update"]:
+        groups.setdefault(tuple(changed), []).append((row, exercise))
+    for fields, group in groups.items():
+        values = {field: bindparam(f"b_{field}") for field in fields}
+        conn.execute(
+            update(table).where(table.c.id == bindparam("b_id")).values(**values),
+            [{"b_id": row.id, **to_values(exercise, fields, prefix="b_")} for row, exercise in group],
+        )
+
+    retagged = [(row, exercise) for row, exercise, changed in changes["update"] if "tags" in changed]
+    if retagged:
+        conn.execute(delete(tag_table).where(tag_table.c.exercise_id.in_([row.id for row, _ in retagged])))
+        for row, exercise in retagged:
+            tag_rows.extend({"exercise_id": row.id, "tag": tag} for tag in exercise.tags)
+
+    if tag_rows:
+        conn.execute(insert(tag_table), tag_rows)
+
+    if changes["deactivate"]:
+        conn.execute(
+            update(table)
+            .where(table.c.id.in_([row.id for row in changes["deactivate"]]))
+            .values(is_active=False)
+        )
+
+def report(changes):
+    for exercise in changes["insert"]:
+        print(f"＋ 新增 sort_order={exercise.sort_order} {exercise.title}")
+    for row, exercise, changed in changes["update"]:
+        print(f"✎ 更新 sort_order={exercise.sort_order} id={row.id} {exercise.title}: {', '.join(changed)}")
+    for row in changes["deactivate"]:
+        print(f"－ 停用 sort_order={row.sort_order} id={row.id} {row.title}")
+
+def sync_exercises(source_path=None, deactivate_missing=False, dry_run=False):
+    source = load_source(source_path)
+    with engine.begin() as conn:
+        changes = plan_changes(conn, source, deactivate_missing=deactivate_missing)
+        report(changes)
+        if not dry_run:
+            apply_changes(conn, changes)
+    return changes
+
+def main():
+    parser = argparse.ArgumentParser(description="按 sort_order 同步题目数据")
+    parser.add_argument("--source", help="题目源数据 JSON 文件，默认使用 init_exercises.py 中的题目")
+    parser.add_argument("--deactivate-missing", action="store_true", help="停用源数据中不存在的题目")
+    parser.add_argument("--dry-run", action="store_true", help="只列出变更，不写入")
+    args = parser.parse_args()
+
+    try:
+        changes = sync_exercises(args.source, args.deactivate_missing, args.dry_run)
+        action = "待" if args.dry_run else "已"
+        print(
+            f"✅ 题目同步完成！{action}新增 {len(changes['insert'])} 道，"
+            f"{action}更新 {len(changes['update'])} 道，{action}停用 {len(changes['deactivate'])} 道，"
+            f"未变化 {changes['unchanged']} 道"
+        )
+        if not args.dry_run and (changes["insert"] or changes["update"] or changes["deactivate"]):
+            print("提示：运行中的服务会在题目缓存过期（EXERCISE_CACHE_TTL）后读取到新数据")
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
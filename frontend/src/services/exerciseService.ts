@@ -14,6 +14,9 @@ export interface Exercise {
   attempt_count: number
   success_count: number
   avg_time?: number
+  p50_time?: number
+  p90_time?: number
+  p99_time?: number
   created_at: string
   updated_at?: string
 }
@@ -36,18 +39,33 @@ export interface ExerciseStats {
   }
 }
 
-export interface UserProgress {
+export interface ExerciseFacets {
+  total: number
+  tags: { tag: string; count: number }[]
+  difficulties: { difficulty: string; count: number }[]
+}
+
+export interface ExerciseProgressStats {
   total_attempts: number
   completed_exercises: number
+  attempted_exercises: number
+  solved_exercises: number
   total_score: number
 }
 
+export interface UserProgress extends ExerciseProgressStats {
+  by_difficulty: {
+    [difficulty: string]: ExerciseProgressStats
+  }
+}
+
 export interface ExerciseFilters {
   skip?: number
   limit?: number
   difficulty?: string
   search?: string
   sort_by?: string
+  tags?: string[]
 }
 
 class ExerciseService {
@@ -60,6 +78,7 @@ class ExerciseService {
       if (filters.difficulty) params.append('difficulty', filters.difficulty)
       if (filters.search) params.append('search', filters.search)
       if (filters.sort_by) params.append('sort_by', filters.sort_by)
+      if (filters.tags?.length) params.append('tags', filters.tags.join(','))
 
       const response = await api.get(`/exercises/?${params.toString()}`)
       return response.data
@@ -70,11 +89,12 @@ class ExerciseService {
   }
 
   // 获取符合筛选条件的总数（用于分页）
-  async countExercises(filters: Pick<ExerciseFilters, 'difficulty' | 'search'> = {}): Promise<number> {
+  async countExercises(filters: Pick<ExerciseFilters, 'difficulty' | 'search' | 'tags'> = {}): Promise<number> {
     try {
       const params = new URLSearchParams()
       if (filters.difficulty) params.append('difficulty', filters.difficulty)
       if (filters.search) params.append('search', filters.search)
+      if (filters.tags?.length) params.append('tags', filters.tags.join(','))
       const response = await api.get(`/exercises/count?${params.toString()}`)
       return response.data.total ?? 0
     } catch (error) {
@@ -83,6 +103,21 @@ class ExerciseService {
     }
   }
 
+  // 获取当前筛选条件下各标签、各难度的题目数
+  async getFacets(filters: Pick<ExerciseFilters, 'difficulty' | 'search' | 'tags'> = {}): Promise<ExerciseFacets> {
+    try {
+      const params = new URLSearchParams()
+      if (filters.difficulty) params.append('difficulty', filters.difficulty)
+      if (filters.search) params.append('search', filters.search)
+      if (filters.tags?.length) params.append('tags', filters.tags.join(','))
+      const response = await api.get(`/exercises/facets?${params.toString()}`)
+      return response.data
+    } catch (error) {
+      console.error('Failed to fetch exercise facets:', error)
+      throw error
+    }
+  }
+
   // 获取单个题目
   async getExercise(id: number): Promise<Exercise> {
     try {
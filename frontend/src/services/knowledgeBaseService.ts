@@ -9,6 +9,7 @@ export interface QuestionBank {
   created_at: string
   updated_at?: string
   question_count?: number
+  type_counts?: Record<string, number>
 }
 
 export interface Question {